@@ -0,0 +1,160 @@
+"""
+Per-frame allocation profiling.
+
+While enabled, tracemalloc measures how much memory each phase of a frame
+allocates (the peak above where the phase started, so short-lived
+temporaries count too) and what it keeps. A gc callback counts collections
+and their pauses per frame. Every few frames a pair of tracemalloc
+snapshots attributes the memory a frame keeps to the lines that allocated
+it; kept objects are what drives the garbage collector.
+
+Profiling slows the game down noticeably; it is meant for diagnosis and
+for check_allocations.py, not for normal play.
+"""
+
+import gc
+import time
+import tracemalloc
+from array import array
+
+
+class PhaseStats:
+    def __init__(self):
+        self.frames = 0
+        self.total_peak = 0
+        self.max_peak = 0
+        self.total_net = 0
+
+
+class AllocationProfiler:
+    def __init__(self, enabled=False, snapshot_every=60, top_n=10, history=3600):
+        self.enabled = enabled
+        self.snapshot_every = snapshot_every
+        self.top_n = top_n
+        self.history = history
+        self.phases = {}
+        self.frames = 0
+        # Per-frame totals, kept for the last `history` frames
+        self.frame_peaks = array('q')
+        self.frame_collections = array('i')
+        self.collections = [0, 0, 0]
+        self.gc_pause_ms = 0.0
+        self.max_gc_pause_ms = 0.0
+        self.call_sites = {}  # "file:line" -> [bytes, count]
+
+        self._phase = None
+        self._phase_start = 0
+        self._frame_peak = 0
+        self._frame_collections = 0
+        self._gc_started = 0.0
+        self._snapshot = None
+        self._running = False
+        # Leave out the profiler's own snapshots
+        self._ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+
+    def start(self):
+        if not self.enabled or self._running:
+            return
+        tracemalloc.start()
+        # Filtering compiles the filter patterns the first time they match
+        # something; do it now, on a block allocated here, so the regex
+        # compiler doesn't show up as a top call site
+        warmup = [None] * 8
+        tracemalloc.take_snapshot().filter_traces(self._ignore)
+        del warmup
+        gc.callbacks.append(self._on_gc)
+        self._running = True
+
+    def stop(self):
+        if not self._running:
+            return
+        gc.callbacks.remove(self._on_gc)
+        tracemalloc.stop()
+        self._running = False
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+            self.collections[info["generation"]] += 1
+            self._frame_collections += 1
+        else:
+            pause = (time.perf_counter() - self._gc_started) * 1000
+            self.gc_pause_ms += pause
+            self.max_gc_pause_ms = max(self.max_gc_pause_ms, pause)
+
+    def begin_frame(self, first_phase="events"):
+        if not self._running:
+            return
+        self._frame_peak = 0
+        self._frame_collections = 0
+        if self.snapshot_every and self.frames % self.snapshot_every == 0:
+            self._snapshot = tracemalloc.take_snapshot()
+        self._phase = None
+        self.mark(first_phase)
+
+    def mark(self, name):
+        """End the current phase and start the next one called name."""
+        if not self._running:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self._phase is not None:
+            stats = self.phases.get(self._phase)
+            if stats is None:
+                stats = self.phases[self._phase] = PhaseStats()
+            allocated = peak - self._phase_start
+            stats.frames += 1
+            stats.total_peak += allocated
+            stats.max_peak = max(stats.max_peak, allocated)
+            stats.total_net += current - self._phase_start
+            self._frame_peak += allocated
+        self._phase = name
+        tracemalloc.reset_peak()
+        # Read again so the phase doesn't pay for the bookkeeping above
+        self._phase_start = tracemalloc.get_traced_memory()[0]
+
+    def end_frame(self):
+        if not self._running:
+            return
+        self.mark(None)
+        self._phase = None
+        self.frames += 1
+        self.frame_peaks.append(self._frame_peak)
+        self.frame_collections.append(self._frame_collections)
+        if len(self.frame_peaks) > self.history:
+            del self.frame_peaks[0]
+            del self.frame_collections[0]
+
+        if self._snapshot is not None:
+            before = self._snapshot.filter_traces(self._ignore)
+            after = tracemalloc.take_snapshot().filter_traces(self._ignore)
+            for stat in after.compare_to(before, "lineno")[:self.top_n]:
+                if stat.size_diff <= 0:
+                    continue
+                frame = stat.traceback[0]
+                site = self.call_sites.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+                site[0] += stat.size_diff
+                site[1] += stat.count_diff
+            self._snapshot = None
+
+    def percentile(self, fraction):
+        if not self.frame_peaks:
+            return 0
+        ordered = sorted(self.frame_peaks)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def report(self):
+        lines = [f"Allocation profile over {self.frames} frames"]
+        lines.append(f"  per frame: median {self.percentile(0.5)} B, "
+                     f"p95 {self.percentile(0.95)} B, max {max(self.frame_peaks, default=0)} B")
+        lines.append(f"  gc collections by generation: {self.collections}, "
+                     f"total pause {self.gc_pause_ms:.1f} ms, max pause {self.max_gc_pause_ms:.2f} ms")
+        lines.append("  phase          avg alloc B   max alloc B   avg kept B")
+        for name, stats in sorted(self.phases.items(), key=lambda item: -item[1].total_peak):
+            lines.append(f"  {name:<14} {stats.total_peak // stats.frames:>11} "
+                         f"{stats.max_peak:>13} {stats.total_net // stats.frames:>12}")
+        if self.call_sites:
+            lines.append("  top call sites keeping memory (sampled frames):")
+            sites = sorted(self.call_sites.items(), key=lambda item: -item[1][0])
+            for site, (size, count) in sites[:self.top_n]:
+                lines.append(f"    {size:>8} B {count:>6} blocks  {site}")
+        return "\n".join(lines)
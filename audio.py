@@ -0,0 +1,80 @@
+"""
+Sound effects with a preloaded bank and per-category voice limits.
+
+Every effect is decoded once when the engine is created. Each category
+(lasers, explosions, ...) owns a fixed group of reserved mixer channels, so
+one category can never starve another. When a group is full, the quietest
+priority voice (oldest first) is stolen, or the new sound is dropped if
+everything playing matters more. Playing a sound never allocates.
+"""
+
+import os
+
+import pygame
+from pygame import mixer
+
+
+class AudioEngine:
+    def __init__(self, groups, effects, directory='sounds'):
+        """
+        groups: category -> number of channels (its voice limit)
+        effects: name -> (filename, category, volume)
+        """
+        total = sum(groups.values())
+        mixer.set_num_channels(total)
+        # Reserve every channel so pygame's own channel picking never touches them
+        mixer.set_reserved(total)
+
+        self.groups = {}
+        first = 0
+        for category, count in groups.items():
+            channels = [mixer.Channel(first + i) for i in range(count)]
+            # Priority and start tick of the voice on each channel
+            self.groups[category] = (channels, [0] * count, [0] * count)
+            first += count
+
+        self.sounds = {}
+        for name, (filename, category, volume) in effects.items():
+            path = os.path.join(directory, filename)
+            if not os.path.exists(path):
+                continue
+            sound = mixer.Sound(path)
+            sound.set_volume(volume)
+            self.sounds[name] = (sound, self.groups[category])
+
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0
+
+    def play(self, name, priority=0):
+        entry = self.sounds.get(name)
+        if entry is None:
+            return False
+        sound, (channels, priorities, started) = entry
+        now = pygame.time.get_ticks()
+
+        # Prefer a free channel, otherwise the lowest priority, oldest voice
+        victim = -1
+        for i in range(len(channels)):
+            if not channels[i].get_busy():
+                victim = i
+                break
+            if victim < 0 or priorities[i] < priorities[victim] or \
+                    (priorities[i] == priorities[victim] and started[i] < started[victim]):
+                victim = i
+        else:
+            if priorities[victim] > priority:
+                self.dropped += 1
+                return False
+            self.stolen += 1
+
+        channels[victim].play(sound)
+        priorities[victim] = priority
+        started[victim] = now
+        self.played += 1
+        return True
+
+    def stop(self):
+        for channels, priorities, started in self.groups.values():
+            for channel in channels:
+                channel.stop()
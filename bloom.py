@@ -0,0 +1,154 @@
+"""
+Bloom post-process.
+
+Anything that should glow is tagged during drawing (a rect or a circle in
+its glow color, in logical coordinates) into an emissive buffer at a
+fraction of the logical size. Once per frame the tagged region of that
+buffer gets a few separable box-blur passes in NumPy, which together
+approximate a Gaussian, and is scaled up to the canvas's rendered
+resolution and added onto it in a single blit. The cost depends on the
+glowing area, not on how many things glow, and nothing is drawn or
+blurred at all on frames where nothing glows.
+"""
+
+import functools
+
+import numpy as np
+import pygame
+
+
+@functools.lru_cache(maxsize=None)
+def disc(radius):
+    """0/1 weights of a filled circle, shaped (width, height, 1) for RGB arrays."""
+    offsets = np.arange(-radius, radius + 1)
+    inside = offsets[:, None] ** 2 + offsets[None, :] ** 2 <= radius * radius
+    return inside.astype(np.uint32)[:, :, None]
+
+
+class Bloom:
+    def __init__(self, size, scale=4, radius=3, strength=1.0):
+        """
+        scale: how many logical pixels one emissive pixel covers per side
+        radius: box-blur radius per pass, in emissive pixels
+        strength: multiplier on the blurred glow before it is added
+        """
+        self.size = size
+        self.scale = scale
+        self.radius = radius
+        self._strength = int(strength * 256)  # fixed point, 8 fractional bits
+        self.small_size = (max(1, size[0] // scale), max(1, size[1] // scale))
+
+        width, height = self.small_size
+        pad = radius
+        # Emissive colors, with a border of zeros so blurring can read past
+        # the edges without bounds checks
+        self._emissive = np.zeros((width + 2 * pad, height + 2 * pad, 3), np.uint32)
+        # Flat storage for the block being blurred and a scratch buffer; the
+        # block only ever uses a prefix, shaped to the area blurred that frame
+        self._block = np.zeros(self._emissive.size, np.uint32)
+        self._scratch = np.zeros_like(self._block)
+        self._small = pygame.Surface(self.small_size, 0, 32)
+        self._glow = pygame.Surface(size, 0, 32)
+        # Bounds of everything tagged this frame, in emissive pixels
+        self._left = self._top = self._right = self._bottom = 0
+
+    def begin_frame(self):
+        if self._right > self._left:
+            self._emissive.fill(0)
+        self._left = self._top = self._right = self._bottom = 0
+
+    def add_rect(self, rect, color, intensity=1.0):
+        """Make a canvas rect glow in color."""
+        scale = self.scale
+        x0, y0 = rect[0] // scale, rect[1] // scale
+        x1, y1 = -(-(rect[0] + rect[2]) // scale), -(-(rect[1] + rect[3]) // scale)
+        region = self._region(x0, y0, x1, y1)
+        if region is not None:
+            color = self._color(color, intensity)
+            # Row by row: contiguous rows need no temporary buffers
+            for row in region:
+                np.maximum(row, color, out=row)
+
+    def add_circle(self, center, radius, color, intensity=1.0):
+        scale = self.scale
+        r = max(1, radius // scale)
+        cx, cy = center[0] // scale, center[1] // scale
+        region = self._region(cx - r, cy - r, cx + r + 1, cy + r + 1)
+        if region is not None and region.shape[:2] == (2 * r + 1, 2 * r + 1):
+            np.maximum(region, disc(r) * self._color(color, intensity), out=region)
+
+    def _color(self, color, intensity):
+        return (np.array(color[:3], np.float32) * intensity).astype(np.uint32)
+
+    def _region(self, x0, y0, x1, y1):
+        """The emissive pixels covering x0..x1, y0..y1, clipped, or None."""
+        width, height = self.small_size
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(width, x1), min(height, y1)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        if self._right > self._left:
+            self._left, self._top = min(self._left, x0), min(self._top, y0)
+            self._right, self._bottom = max(self._right, x1), max(self._bottom, y1)
+        else:
+            self._left, self._top, self._right, self._bottom = x0, y0, x1, y1
+        pad = self.radius
+        return self._emissive[pad + x0:pad + x1, pad + y0:pad + y1]
+
+    def composite(self, surface, passes=3):
+        """Blur what was tagged and add it onto surface.
+
+        surface is the canvas at its rendered resolution, which may differ
+        from the size the tags are in.
+        """
+        if self._right <= self._left or passes <= 0:
+            return
+        pad = self.radius
+        width, height = self.small_size
+        # Grow the tagged bounds by how far the blur spreads
+        reach = pad * passes
+        x0, y0 = max(0, self._left - reach), max(0, self._top - reach)
+        x1, y1 = min(width, self._right + reach), min(height, self._bottom + reach)
+
+        # Copy the area, with a border of zeros, into a contiguous block
+        # and blur that flattened: every column of the block is one run, so
+        # each shifted sum is a plain 1-D operation with no temporary
+        # arrays. A step along x is one column, a step along y is one pixel.
+        # Nothing spreads past the area, so pixels outside it stay zero.
+        block_width, block_height = x1 - x0 + 2 * pad, y1 - y0 + 2 * pad
+        column = block_height * 3
+        flat = self._block[:block_width * column]
+        out = self._scratch[:block_width * column]
+        block = flat.reshape(block_width, block_height, 3)
+        np.copyto(block, self._emissive[x0:x1 + 2 * pad, y0:y1 + 2 * pad])
+        start, end = pad * column, (block_width - pad) * column
+        for _ in range(passes):
+            for step in (column, 3):
+                out[start:end] = 0
+                for shift in range(-pad * step, (pad + 1) * step, step):
+                    np.add(out[start:end], flat[start + shift:end + shift], out=out[start:end])
+                np.floor_divide(out[start:end], 2 * pad + 1, out=flat[start:end])
+                # Steps along y leak into the border; keep it zero
+                block[:, :pad].fill(0)
+                block[:, block_height - pad:].fill(0)
+
+        glow = flat[start:end]
+        if self._strength != 256:
+            np.multiply(glow, self._strength, out=glow)
+            np.right_shift(glow, 8, out=glow)
+        np.minimum(glow, 255, out=glow)
+        # Write straight into the small surface's pixels
+        pixels = pygame.surfarray.pixels3d(self._small)
+        np.copyto(pixels[x0:x1, y0:y1], block[pad:block_width - pad, pad:block_height - pad], casting="unsafe")
+        del pixels  # unlocks the surface
+
+        # Scale the blurred area up and add it in one blit
+        if self._glow.get_size() != surface.get_size():
+            self._glow = pygame.Surface(surface.get_size(), 0, 32)
+        scale = self.scale * surface.get_width() / self.size[0]
+        small_rect = pygame.Rect(x0, y0, x1 - x0, y1 - y0)
+        rect = pygame.Rect(round(x0 * scale), round(y0 * scale), round((x1 - x0) * scale), round((y1 - y0) * scale))
+        rect = rect.clip(self._glow.get_rect())
+        pygame.transform.smoothscale(self._small.subsurface(small_rect), rect.size,
+                                     self._glow.subsurface(rect))
+        surface.blit(self._glow, rect.topleft, rect, special_flags=pygame.BLEND_ADD)
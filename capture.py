@@ -0,0 +1,215 @@
+"""
+Gameplay capture.
+
+Each captured frame is copied straight from the canvas into one slot of a
+preallocated ring in shared memory; that copy is all the game thread does.
+Frames are then either encoded to numbered PNG files by a pool of worker
+processes or streamed as raw video into an external encoder (ffmpeg by
+default) by a writer thread. When every slot is still waiting to be
+encoded the frame is dropped and counted, never waited for; dropped frames
+leave gaps in the PNG numbering.
+
+PNG workers are forked so they inherit the ring, which restricts PNG
+capture to platforms where fork is available and safe; elsewhere only
+video capture works.
+"""
+
+import concurrent.futures
+import mmap
+import multiprocessing
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+# Raw video pixel formats by (red, green, blue byte offsets, bytes per pixel)
+PIPE_PIXEL_FORMATS = {
+    ((2, 1, 0), 4): "bgr0",
+    ((0, 1, 2), 4): "rgb0",
+    ((3, 2, 1), 4): "0bgr",
+    ((1, 2, 3), 4): "0rgb",
+    ((2, 1, 0), 3): "bgr24",
+    ((0, 1, 2), 3): "rgb24",
+}
+
+DEFAULT_ENCODER = ("ffmpeg", "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "{pix_fmt}",
+                   "-s", "{width}x{height}", "-r", "{fps}", "-i", "-", "-pix_fmt", "yuv420p", "{output}")
+
+# Set before the worker processes are forked, so they inherit the mapping
+_ring = None
+_layout = None
+
+
+def can_fork_workers():
+    # macOS has fork, but system frameworks aren't safe to use in a forked child
+    return "fork" in multiprocessing.get_all_start_methods() and sys.platform != "darwin"
+
+
+def _frame_pixels(offset):
+    """The frame in a slot as an RGB array (height, width, 3)."""
+    width, height, pitch, bytesize, channels = _layout
+    rows = np.frombuffer(_ring, np.uint8, height * pitch, offset).reshape(height, pitch)
+    return rows[:, :width * bytesize].reshape(height, width, bytesize)[:, :, channels]
+
+
+def _encode_png(offset, path):
+    # Runs in a worker process
+    width, height = _layout[0], _layout[1]
+    surface = pygame.image.frombuffer(_frame_pixels(offset).tobytes(), (width, height), "RGB")
+    pygame.image.save(surface, path)
+
+
+def _start_worker():
+    # Encoding yields the CPU to the game whenever both want it
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+class FrameCapture:
+    def __init__(self, surface, output, slots=12, workers=2, fps=60, encoder=None):
+        """
+        output: a directory for PNG frames, or a video file name when
+        encoder is given (a command template; see DEFAULT_ENCODER)
+        """
+        global _ring, _layout
+        width, height = surface.get_size()
+        bytesize = surface.get_bytesize()
+        shifts = surface.get_shifts()[:3]
+        channels = tuple(shift // 8 for shift in shifts)
+        if (channels, bytesize) not in PIPE_PIXEL_FORMATS:
+            raise ValueError(f"can't capture {bytesize * 8}-bit surfaces with shifts {shifts}")
+        if encoder is None and not can_fork_workers():
+            raise RuntimeError(f"PNG capture needs fork(), which isn't available or safe on {sys.platform}; "
+                               "capture to a video file instead")
+
+        self.output = output
+        self.size = (width, height)
+        self.frame_bytes = height * surface.get_pitch()
+        self.captured = 0
+        self.dropped = 0
+        self.encoded = 0
+        self.failed = 0
+        self.longest_drop_run = 0
+        self.grab_ms = 0.0
+        self.max_grab_ms = 0.0
+        self._drop_run = 0
+        self._frame_number = 0
+        self._free = deque(range(slots))
+
+        _ring = self._ring = mmap.mmap(-1, slots * self.frame_bytes)
+        _layout = (width, height, surface.get_pitch(), bytesize, list(channels))
+
+        self._pool = None
+        self._encoder = None
+        self._writer = None
+        if encoder is None:
+            os.makedirs(output, exist_ok=True)
+            # Fork the workers now, while the ring is set up and before the
+            # game starts its own threads
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("fork"), initializer=_start_worker)
+            self._pool.submit(int).result()
+        else:
+            fields = {"pix_fmt": PIPE_PIXEL_FORMATS[channels, bytesize], "width": width,
+                      "height": height, "fps": fps, "output": output}
+            try:
+                self._encoder = subprocess.Popen([arg.format(**fields) for arg in encoder],
+                                                 stdin=subprocess.PIPE)
+            except FileNotFoundError:
+                self._ring.close()
+                raise RuntimeError(f"can't record video: the encoder {encoder[0]!r} isn't installed "
+                                   "or isn't on the PATH") from None
+            self._pending = queue.SimpleQueue()
+            self._writer = threading.Thread(target=self._write_frames, name="capture-writer", daemon=True)
+            self._writer.start()
+
+    def grab(self, surface):
+        """Copy the frame into a free slot, or drop it if none is free."""
+        started = time.perf_counter()
+        number = self._frame_number
+        self._frame_number += 1
+        try:
+            slot = self._free.popleft()
+        except IndexError:
+            self.dropped += 1
+            self._drop_run += 1
+            self.longest_drop_run = max(self.longest_drop_run, self._drop_run)
+            return False
+        self._drop_run = 0
+
+        offset = slot * self.frame_bytes
+        pixels = surface.get_buffer()
+        self._ring[offset:offset + self.frame_bytes] = pixels
+        del pixels  # unlocks the surface
+
+        if self._pool is not None:
+            path = os.path.join(self.output, f"frame_{number:06d}.png")
+            future = self._pool.submit(_encode_png, offset, path)
+            future.add_done_callback(lambda future, slot=slot: self._encoded(future, slot))
+        else:
+            self._pending.put(slot)
+        self.captured += 1
+
+        elapsed = (time.perf_counter() - started) * 1000
+        self.grab_ms += elapsed
+        self.max_grab_ms = max(self.max_grab_ms, elapsed)
+        return True
+
+    def _encoded(self, future, slot):
+        if future.exception() is None:
+            self.encoded += 1
+        else:
+            self.failed += 1
+        self._free.append(slot)
+
+    def _write_frames(self):
+        width, height, pitch, bytesize, channels = _layout
+        row_bytes = width * bytesize
+        while True:
+            slot = self._pending.get()
+            if slot is None:
+                return
+            offset = slot * self.frame_bytes
+            if pitch == row_bytes:
+                data = memoryview(self._ring)[offset:offset + self.frame_bytes]
+            else:
+                rows = np.frombuffer(self._ring, np.uint8, height * pitch, offset).reshape(height, pitch)
+                data = rows[:, :row_bytes].tobytes()
+            try:
+                self._encoder.stdin.write(data)
+                self.encoded += 1
+            except OSError:
+                # The encoder exited; keep draining so grab() still drops instead of stalling
+                self.failed += 1
+            del data
+            self._free.append(slot)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._writer is not None:
+            self._pending.put(None)
+            self._writer.join()
+            self._writer = None
+            try:
+                self._encoder.stdin.close()
+            except OSError:
+                pass
+            self._encoder.wait()
+
+    def report(self):
+        total = self.captured + self.dropped
+        dropped_percent = 100 * self.dropped / total if total else 0
+        average_ms = self.grab_ms / self.captured if self.captured else 0
+        lines = [f"Capture to {self.output}: {self.captured} of {total} frames captured, "
+                 f"{self.dropped} dropped ({dropped_percent:.1f}%, longest run {self.longest_drop_run})",
+                 f"  encoded {self.encoded}, failed {self.failed}; "
+                 f"game thread {average_ms:.2f} ms per frame, max {self.max_grab_ms:.2f} ms"]
+        return "\n".join(lines)
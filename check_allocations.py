@@ -0,0 +1,109 @@
+"""
+Allocation regression check.
+
+Plays scripted gameplay frames headlessly with the allocation profiler on
+and fails (exit status 1) when steady-state frames allocate more than the
+budget, or when any full (generation 2) garbage collection happens during
+the measured frames.
+
+Usage: python check_allocations.py [--frames N] [--budget BYTES]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+# Run without a window or sound device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import shooting_game as sg
+
+FRAME_MS = 1000 / 60
+WARMUP_FRAMES = 600
+DEFAULT_FRAMES = 1200
+# p95 bytes allocated per steady-state frame; raise it only on purpose
+DEFAULT_BUDGET = 48 * 1024
+
+
+class ScriptedKeys:
+    """Stands in for pygame.key.get_pressed(): fire constantly and sweep left and right."""
+
+    def __init__(self):
+        self.frame = 0
+
+    def __getitem__(self, key):
+        if key == pygame.K_SPACE:
+            return True
+        phase = (self.frame // 90) % 2
+        if key == pygame.K_LEFT:
+            return phase == 0
+        if key == pygame.K_RIGHT:
+            return phase == 1
+        return False
+
+
+def play_frames(codec, keys, count):
+    for _ in range(count):
+        sg.profiler.begin_frame()
+        sg.game_clock.advance(FRAME_MS)
+        for step in range(sg.game_clock.steps()):
+            sg.run_game_step(keys, codec)
+        sg.profiler.mark("draw")
+        sg.draw_game()
+        sg.profiler.end_frame()
+        keys.frame += 1
+
+        # Keep the session going so every frame is steady-state gameplay
+        if sg.game.game_state != sg.PLAYING:
+            sg.game.reset()
+            sg.game.game_state = sg.PLAYING
+        sg.game.player_health = 100
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help="maximum p95 bytes allocated per frame")
+    options = parser.parse_args(argv)
+
+    # Keep the player's leaderboard and telemetry out of it
+    data_dir = tempfile.mkdtemp()
+    sg.LEADERBOARD_LOG = os.path.join(data_dir, "leaderboard.log")
+    sg.LEADERBOARD_INDEX = os.path.join(data_dir, "leaderboard.idx")
+    sg.TELEMETRY_ENABLED = False
+    random.seed(0)
+
+    codec = sg.init_game()
+    sg.game.game_state = sg.PLAYING
+    keys = ScriptedKeys()
+
+    # Warm caches (glyph atlases, masks, timers) before measuring
+    play_frames(codec, keys, WARMUP_FRAMES)
+
+    sg.profiler.enabled = True
+    sg.profiler.start()
+    play_frames(codec, keys, options.frames)
+    sg.profiler.stop()
+    print(sg.profiler.report())
+
+    p95 = sg.profiler.percentile(0.95)
+    full_collections = sg.profiler.collections[2]
+    failed = False
+    if p95 > options.budget:
+        print(f"FAIL: p95 frame allocation {p95} B is over the {options.budget} B budget")
+        failed = True
+    if full_collections:
+        print(f"FAIL: {full_collections} full gc collections during steady-state play")
+        failed = True
+    if not failed:
+        print(f"OK: p95 frame allocation {p95} B within {options.budget} B, no full collections")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Pixel-accurate collision helpers.
+
+Masks are built once per sprite image (and once per scaled variant), never
+during play. Callers test bounding rects first and only compare masks for
+pairs whose rects already intersect, so the precise path costs almost
+nothing for the many pairs that are far apart.
+"""
+
+import functools
+
+import pygame
+
+
+class SpriteShape:
+    """A sprite surface together with its collision mask."""
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.mask = pygame.mask.from_surface(surface)
+        self.size = surface.get_size()
+
+
+def scaled_shapes(surface, scales):
+    """Pre-scale a sprite (e.g. pulse animation steps) with a mask for each."""
+    width, height = surface.get_size()
+    return [SpriteShape(pygame.transform.scale(surface, (int(width * s), int(height * s))))
+            for s in scales]
+
+
+@functools.lru_cache(maxsize=None)
+def rect_mask(size):
+    """Fully solid mask for plain rectangles such as lasers."""
+    return pygame.mask.Mask(size, fill=True)
+
+
+def masks_overlap(rect_a, mask_a, rect_b, mask_b):
+    # Callers check rect_a.colliderect(rect_b) first; this is the precise part
+    return mask_a.overlap(mask_b, (rect_b.x - rect_a.x, rect_b.y - rect_a.y)) is not None
@@ -0,0 +1,83 @@
+"""
+Game time and timers.
+
+GameClock only advances while the game is running, scaled by time_scale,
+so pausing or slowing down the game stops or slows every timer with it.
+TimerScheduler keeps pending timers in a min-heap keyed by due time; each
+frame pops just the timers that are due, however many are waiting.
+"""
+
+import heapq
+import itertools
+
+
+class GameClock:
+    def __init__(self):
+        self.time = 0.0  # milliseconds of game time
+        self.paused = False
+        self.time_scale = 1.0
+        self._step_credit = 0.0
+
+    def advance(self, real_ms):
+        if not self.paused:
+            self.time += real_ms * self.time_scale
+
+    def now(self):
+        return int(self.time)
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def steps(self):
+        """Number of simulation steps to run this frame.
+
+        One per frame at normal speed, none while paused, and a step every
+        few frames in slow motion.
+        """
+        if self.paused:
+            return 0
+        self._step_credit += self.time_scale
+        steps = int(self._step_credit)
+        self._step_credit -= steps
+        return steps
+
+
+class TimerScheduler:
+    """Named one-shot timers; setting a name again replaces its timer."""
+
+    def __init__(self):
+        self._heap = []
+        self._timers = {}
+        self._counter = itertools.count()
+
+    def set(self, name, due, callback):
+        self.cancel(name)
+        # Entry: [due, tie-breaker, name, callback]; callback is None once cancelled
+        entry = [due, next(self._counter), name, callback]
+        self._timers[name] = entry
+        heapq.heappush(self._heap, entry)
+
+    def cancel(self, name):
+        entry = self._timers.pop(name, None)
+        if entry is not None:
+            entry[3] = None
+
+    def due(self, name):
+        entry = self._timers.get(name)
+        return entry[0] if entry is not None else None
+
+    def clear(self):
+        self._heap.clear()
+        self._timers.clear()
+
+    def __len__(self):
+        return len(self._timers)
+
+    def run_due(self, now):
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            due, _, name, callback = heapq.heappop(heap)
+            if callback is None:
+                continue
+            del self._timers[name]
+            callback()
@@ -2,6 +2,8 @@ import pygame
 import os
 import math
 import random
+import wave
+import numpy as np
 from pygame import gfxdraw
 
 # Initialize Pygame
@@ -237,6 +239,51 @@ def create_explosion_frames(size=100, num_frames=8):
     
     return frames
 
+SAMPLE_RATE = 22050
+
+def envelope(num_samples, decay):
+    # Exponential decay from full volume
+    return np.exp(-decay * np.linspace(0, 1, num_samples))
+
+def create_laser_sound(duration=0.15):
+    n = int(SAMPLE_RATE * duration)
+    # Falling pitch sweep with a square-ish tone
+    freq = np.linspace(1200, 300, n)
+    phase = 2 * np.pi * np.cumsum(freq) / SAMPLE_RATE
+    tone = np.tanh(3 * np.sin(phase))
+    return tone * envelope(n, 6) * 0.5
+
+def create_explosion_sound(duration=0.6):
+    n = int(SAMPLE_RATE * duration)
+    noise = np.random.uniform(-1, 1, n)
+    # Low-pass the noise with a moving average for a deeper rumble
+    kernel = np.ones(24) / 24
+    rumble = np.convolve(noise, kernel, mode='same')
+    rumble /= np.max(np.abs(rumble))
+    return rumble * envelope(n, 5) * 0.8
+
+def create_hit_sound(duration=0.2):
+    n = int(SAMPLE_RATE * duration)
+    t = np.arange(n) / SAMPLE_RATE
+    thump = np.sin(2 * np.pi * 90 * t) + 0.3 * np.random.uniform(-1, 1, n)
+    return thump * envelope(n, 10) * 0.6
+
+def create_powerup_sound(duration=0.3):
+    n = int(SAMPLE_RATE * duration)
+    t = np.arange(n) / SAMPLE_RATE
+    # Three rising notes
+    notes = np.repeat([523.25, 659.25, 783.99], n // 3 + 1)[:n]
+    phase = 2 * np.pi * np.cumsum(notes) / SAMPLE_RATE
+    return np.sin(phase) * envelope(n, 2) * 0.5
+
+def save_sound(samples, path):
+    data = (np.clip(samples, -1, 1) * 32767).astype('<i2')
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(data.tobytes())
+
 def save_assets():
     # Create assets directory if it doesn't exist
     if not os.path.exists('assets'):
@@ -253,6 +300,15 @@ def save_assets():
     explosion_frames = create_explosion_frames()
     for i, frame in enumerate(explosion_frames):
         pygame.image.save(frame, f'assets/explosion_{i}.png')
+    
+    # Generate and save sound effects
+    if not os.path.exists('sounds'):
+        os.makedirs('sounds')
+    
+    save_sound(create_laser_sound(), 'sounds/laser.wav')
+    save_sound(create_explosion_sound(), 'sounds/explosion.wav')
+    save_sound(create_hit_sound(), 'sounds/hit.wav')
+    save_sound(create_powerup_sound(), 'sounds/powerup.wav')
 
 if __name__ == "__main__":
     save_assets()
@@ -0,0 +1,169 @@
+"""
+Input latency measurement and frame pacing.
+
+pygame doesn't expose when SDL received an event, only when the game
+polled it. So InputLatency brackets each input's latency. The upper bound
+runs from the previous poll, the earliest the input can have arrived
+unseen. The lower bound runs from the poll that picked it up. Both end when
+the frame showing its effect is presented.
+
+FramePacer runs the loop at a fixed rate in one of two ways. Normally it
+works like Clock.tick: poll input, simulate, draw, then sleep out the rest
+of the frame, so input waits through that sleep. With late_latch it
+sleeps first instead, then wakes just early enough to poll, simulate and
+draw before the frame's deadline. That way input is as fresh as possible
+when the frame is shown.
+
+A display that refreshes at fixed intervals picks up the frame around the
+end of its period, not when it was presented. InputLatency therefore also
+records how old the polled input is once the frame's period ends, which
+FramePacer reports as frame_end: after the sleep normally, at the
+deadline with late_latch. That figure is where late latching makes the
+difference.
+"""
+
+import time
+from array import array
+
+import pygame
+
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+
+class LatencyHistogram:
+    """Counts of samples in 1 ms buckets; the last bucket takes everything above."""
+
+    def __init__(self, max_ms=100):
+        self.counts = array('I', bytes(4 * (max_ms + 1)))
+        self.total = 0
+
+    def add(self, ms):
+        self.counts[min(int(ms), len(self.counts) - 1)] += 1
+        self.total += 1
+
+    def percentile(self, fraction):
+        if not self.total:
+            return 0
+        target = fraction * self.total
+        seen = 0
+        for ms, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return ms
+        return len(self.counts) - 1
+
+    def lines(self, width=40):
+        """Text bars for the non-empty buckets."""
+        peak = max(self.counts)
+        lines = []
+        for ms, count in enumerate(self.counts):
+            if count:
+                label = f"{ms:>3}+ ms" if ms == len(self.counts) - 1 else f"{ms:>3} ms"
+                lines.append(f"    {label} {count:>6} {'#' * max(1, count * width // peak)}")
+        return lines
+
+
+class InputLatency:
+    def __init__(self, enabled=False, max_ms=100):
+        self.enabled = enabled
+        self.since_poll = LatencyHistogram(max_ms)
+        self.since_previous_poll = LatencyHistogram(max_ms)
+        self.at_frame_end = LatencyHistogram(max_ms)
+        self._poll = None
+        self._previous_poll = None
+        self._pending = False
+        self._shown = False
+
+    def polled(self, input_events):
+        """Call right after draining the event queue."""
+        if not self.enabled:
+            return
+        self._previous_poll = self._poll
+        self._poll = time.perf_counter()
+        if input_events and self._previous_poll is not None:
+            self._pending = True
+
+    def presented(self):
+        """Call right after the frame is shown."""
+        if not self._pending:
+            return
+        now = time.perf_counter()
+        self.since_poll.add((now - self._poll) * 1000)
+        self.since_previous_poll.add((now - self._previous_poll) * 1000)
+        self._pending = False
+        self._shown = True
+
+    def frame_finished(self, frame_end):
+        """Call after the pacer's end_frame with its frame_end."""
+        if not self._shown:
+            return
+        self.at_frame_end.add((frame_end - self._poll) * 1000)
+        self._shown = False
+
+    def report(self):
+        low, high = self.since_poll, self.since_previous_poll
+        lines = [f"Input-to-present latency over {low.total} frames with input"]
+        for name, histogram in (("at least (from the poll)", low),
+                                ("at most (from the previous poll)", high),
+                                ("input age at the end of the frame", self.at_frame_end)):
+            lines.append(f"  {name}: p50 {histogram.percentile(0.5)} ms, "
+                         f"p95 {histogram.percentile(0.95)} ms, p99 {histogram.percentile(0.99)} ms")
+            lines.extend(histogram.lines())
+        return "\n".join(lines)
+
+
+class FramePacer:
+    def __init__(self, fps=60, late_latch=False, margin_ms=2.0, window=30):
+        """
+        margin_ms: extra time allowed on top of the predicted frame work
+        window: number of recent frames the work prediction looks at
+        """
+        self.period = 1.0 / fps
+        self.fps = fps
+        self.late_latch = late_latch
+        self.margin = margin_ms / 1000
+        self.work_ms = 0.0  # time the last frame spent working, not sleeping
+        self.frame_end = 0.0  # perf_counter time the last frame's period ended
+        self._work = array('d', [self.period / 2] * window)
+        self._next = 0
+        self._clock = pygame.time.Clock()
+        self._frame_start = None
+        self._deadline = None
+
+    def begin_frame(self):
+        """Start a frame; returns milliseconds since the previous one started."""
+        if self.late_latch:
+            now = time.perf_counter()
+            if self._deadline is None:
+                self._deadline = now + self.period
+            wake = self._deadline - self.predicted_work()
+            if wake > now:
+                time.sleep(wake - now)
+        now = time.perf_counter()
+        elapsed = 0.0 if self._frame_start is None else (now - self._frame_start) * 1000
+        self._frame_start = now
+        return elapsed
+
+    def end_frame(self):
+        """Finish a frame once it has been presented."""
+        work = time.perf_counter() - self._frame_start
+        self.work_ms = work * 1000
+        self._work[self._next] = work
+        self._next = (self._next + 1) % len(self._work)
+        if self.late_latch:
+            # The period ends at the deadline, or now if the frame overran;
+            # the sleep before the next frame covers the rest
+            now = time.perf_counter()
+            self.frame_end = max(self._deadline, now)
+            # Aim for the next deadline, or re-anchor after a frame overran
+            self._deadline += self.period
+            if self._deadline - self.predicted_work() < now:
+                self._deadline = now + self.predicted_work()
+        else:
+            self._clock.tick(self.fps)
+            self.frame_end = time.perf_counter()
+
+    def predicted_work(self):
+        # Near the slowest recent frame, so a typical spike still makes the deadline
+        ordered = sorted(self._work)
+        return ordered[int(len(ordered) * 0.9)] + self.margin
@@ -0,0 +1,218 @@
+"""
+Persistent leaderboard.
+
+Every finished run is appended to a log of fixed-size records. A sorted
+index file (best score first) is memory-mapped for top-N and rank queries,
+and runs that haven't been merged into it yet sit in a small sorted list.
+All disk writes happen on a background thread with one fsync per batch, so
+submitting a score never waits on the disk.
+"""
+
+import bisect
+import heapq
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+
+RECORD = struct.Struct("<iiiq")  # score, wave_number, level, timestamp
+INDEX_HEADER = struct.Struct("<4sIQ")  # magic, version, records covered
+INDEX_ENTRY = struct.Struct("<iQ")  # score, record number
+INDEX_MAGIC = b"SSLB"
+INDEX_VERSION = 1
+
+
+class Leaderboard:
+    def __init__(self, log_path, index_path, merge_threshold=4096, flush_interval=0.5):
+        self.log_path = log_path
+        self.index_path = index_path
+        self.merge_threshold = merge_threshold
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._index_file = None
+        self._index_map = None
+        self._index_count = 0
+        self._index_covered = 0
+        self._open_index()
+
+        # Drop a half-written record left by a crash so appends stay aligned
+        log_size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+        self._record_count = log_size // RECORD.size
+        with open(log_path, "ab") as f:
+            f.truncate(self._record_count * RECORD.size)
+        if self._index_covered > self._record_count:
+            self._index_covered = 0
+            self._close_index()
+
+        # Runs logged after the last merge, sorted as (-score, record, wave, level, timestamp)
+        self._pending = []
+        if self._record_count > self._index_covered:
+            with open(log_path, "rb") as f:
+                f.seek(self._index_covered * RECORD.size)
+                data = f.read((self._record_count - self._index_covered) * RECORD.size)
+            for i, (score, wave, level, timestamp) in enumerate(RECORD.iter_unpack(data)):
+                self._pending.append((-score, self._index_covered + i, wave, level, timestamp))
+            self._pending.sort()
+
+        self._written = self._record_count
+        self._top_cache = None
+        self._top_n = 0  # n the cache was built for; it holds min(n, len) runs
+        self._log = open(log_path, "ab")
+        self._reader = open(log_path, "rb")
+        self._thread = threading.Thread(target=self._run, name="leaderboard-writer", daemon=True)
+        self._thread.start()
+
+    def _open_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        f = open(self.index_path, "rb")
+        size = os.fstat(f.fileno()).st_size
+        if size < INDEX_HEADER.size:
+            f.close()
+            return
+        index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, covered = INDEX_HEADER.unpack_from(index_map, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            # Unknown index; rebuild it from the log
+            index_map.close()
+            f.close()
+            return
+        self._index_file = f
+        self._index_map = index_map
+        self._index_count = (size - INDEX_HEADER.size) // INDEX_ENTRY.size
+        self._index_covered = covered
+
+    def _close_index(self):
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_file.close()
+        self._index_file = None
+        self._index_map = None
+        self._index_count = 0
+
+    def _index_entry(self, i):
+        return INDEX_ENTRY.unpack_from(self._index_map, INDEX_HEADER.size + i * INDEX_ENTRY.size)
+
+    def _read_record(self, record_no):
+        self._reader.seek(record_no * RECORD.size)
+        return RECORD.unpack(self._reader.read(RECORD.size))
+
+    def submit(self, score, wave_number, level):
+        """Record a finished run and return its rank (1 is best)."""
+        timestamp = int(time.time())
+        with self._lock:
+            record_no = self._record_count
+            self._record_count += 1
+            bisect.insort(self._pending, (-score, record_no, wave_number, level, timestamp))
+            self._top_cache = None
+            rank = self._rank(score)
+        self._queue.put(RECORD.pack(score, wave_number, level, timestamp))
+        return rank
+
+    def rank(self, score):
+        """Rank a score would get among all recorded runs."""
+        with self._lock:
+            return self._rank(score)
+
+    def _rank(self, score):
+        # Index is sorted best first: find the first entry not beating score
+        lo, hi = 0, self._index_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._index_entry(mid)[0] > score:
+                lo = mid + 1
+            else:
+                hi = mid
+        return 1 + lo + bisect.bisect_left(self._pending, (-score,))
+
+    def top(self, n=10):
+        """Best n runs as (score, wave_number, level, timestamp), best first."""
+        with self._lock:
+            # Built for at least n, the cache is complete even when fewer runs exist
+            if self._top_cache is None or n > self._top_n:
+                entries = []
+                for i in range(min(n, self._index_count)):
+                    score, record_no = self._index_entry(i)
+                    entries.append((-score, record_no) + self._read_record(record_no)[1:])
+                entries.extend(self._pending[:n])
+                entries.sort()
+                self._top_cache = [(-e[0],) + e[2:] for e in entries[:n]]
+                self._top_n = n
+            return self._top_cache[:n]
+
+    def best(self):
+        top = self.top(1)
+        return top[0][0] if top else 0
+
+    def __len__(self):
+        return self._record_count
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._log.close()
+        self._reader.close()
+        with self._lock:
+            self._close_index()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            # Collect everything else that arrives within the flush interval
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                stop = True
+
+            if batch:
+                self._log.write(b"".join(batch))
+                self._log.flush()
+                os.fsync(self._log.fileno())
+                with self._lock:
+                    self._written += len(batch)
+                    merge = self._written - self._index_covered >= self.merge_threshold
+                if merge:
+                    self._merge()
+
+    def _merge(self):
+        with self._lock:
+            covered = self._written
+            merged = [(-e[0], e[1]) for e in self._pending if e[1] < covered]
+            index_count = self._index_count
+
+        # Stream the old index and the new runs into a fresh sorted file.
+        # Only the writer thread replaces the index, so reading it unlocked is safe.
+        old = (self._index_entry(i) for i in range(index_count))
+        key = lambda e: (-e[0], e[1])
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, covered))
+            chunk = []
+            for entry in heapq.merge(old, merged, key=key):
+                chunk.append(INDEX_ENTRY.pack(*entry))
+                if len(chunk) == 8192:
+                    f.write(b"".join(chunk))
+                    chunk.clear()
+            f.write(b"".join(chunk))
+            f.flush()
+            os.fsync(f.fileno())
+
+        with self._lock:
+            self._close_index()
+            os.replace(tmp_path, self.index_path)
+            self._open_index()
+            self._pending = [e for e in self._pending if e[1] >= covered]
@@ -0,0 +1,90 @@
+"""
+Adaptive render quality.
+
+The governor watches how long each frame takes to simulate and draw, and
+moves between quality tiers to stay inside the frame budget. It drops a
+tier as soon as a window of frames runs slow, but only climbs back after
+several windows in a row with plenty of headroom, and waits longer each
+time a climb turns out to be too much, so it settles instead of flapping.
+"""
+
+
+class QualityTier:
+    def __init__(self, name, bloom_passes, text_glow, title_glow, hud_gradient,
+                 pulse_scaling, parallax, particle_cap):
+        self.name = name
+        self.bloom_passes = bloom_passes  # blur passes of the glow post-process; 0 turns it off
+        self.text_glow = text_glow  # glow behind HUD text
+        self.title_glow = title_glow
+        self.hud_gradient = hud_gradient  # per-line gradients vs. flat fills
+        self.pulse_scaling = pulse_scaling  # rescale power-ups every frame
+        self.parallax = parallax  # scrolling background vs. static
+        self.particle_cap = particle_cap  # explosions kept alive at once
+
+
+QUALITY_TIERS = [
+    QualityTier("high", 3, True, True, True, True, True, 64),
+    QualityTier("medium", 2, True, True, False, True, True, 32),
+    QualityTier("low", 1, False, True, False, False, True, 16),
+    QualityTier("minimal", 0, False, False, False, False, False, 8),
+]
+
+
+class QualityGovernor:
+    def __init__(self, tiers=QUALITY_TIERS, budget_ms=1000 / 60, window=60,
+                 downgrade_ratio=0.9, upgrade_ratio=0.6, upgrade_windows=3, start=0):
+        self.tiers = tiers
+        self.budget_ms = budget_ms
+        self.window = window
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.upgrade_windows = upgrade_windows
+        self.level = start
+        self.tier = tiers[start]
+        self.changes = 0
+
+        self._samples = [0.0] * window
+        self._count = 0
+        self._headroom_windows = 0
+        # Windows of headroom needed before climbing; doubles after a failed climb
+        self._required = upgrade_windows
+        self._just_upgraded = False
+
+    def update(self, frame_ms):
+        """Record one frame's work time; returns True if the tier changed."""
+        self._samples[self._count] = frame_ms
+        self._count += 1
+        if self._count < self.window:
+            return False
+        self._count = 0
+
+        # Judge by the 90th percentile so a few hitches count but one doesn't
+        ordered = sorted(self._samples)
+        p90 = ordered[int(self.window * 0.9) - 1]
+
+        if p90 > self.budget_ms * self.downgrade_ratio:
+            self._headroom_windows = 0
+            if self._just_upgraded:
+                self._required *= 2
+            self._just_upgraded = False
+            return self._set_level(self.level + 1)
+
+        self._just_upgraded = False
+        if p90 < self.budget_ms * self.upgrade_ratio:
+            self._headroom_windows += 1
+            if self._headroom_windows >= self._required and self._set_level(self.level - 1):
+                self._headroom_windows = 0
+                self._just_upgraded = True
+                return True
+        else:
+            self._headroom_windows = 0
+        return False
+
+    def _set_level(self, level):
+        level = max(0, min(len(self.tiers) - 1, level))
+        if level == self.level:
+            return False
+        self.level = level
+        self.tier = self.tiers[level]
+        self.changes += 1
+        return True
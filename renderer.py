@@ -0,0 +1,153 @@
+"""
+Fixed logical canvas scaled to the window.
+
+All game drawing uses logical coordinates, so positions in the game never
+depend on the window or on the resolution things are rendered at. The
+canvas itself is rendered at the logical size times a render scale: 0.5
+draws a quarter of the pixels, which suits weak machines. Canvas maps
+logical coordinates onto it where drawing happens, using images scaled
+once on first use rather than on every draw.
+
+Presenting scales the canvas to the window once per frame, keeping the
+aspect ratio and letterboxing the rest. When the window is exactly the
+rendered size the canvas is the window surface itself and presenting
+costs nothing extra; at a render scale of 1 drawing costs nothing extra
+either.
+"""
+
+import functools
+import weakref
+
+import pygame
+
+
+def scale_image(image, size, smooth=True):
+    if smooth and image.get_bitsize() in (24, 32):
+        return pygame.transform.smoothscale(image, size)
+    return pygame.transform.scale(image, size)
+
+
+class Canvas:
+    """Draws at logical coordinates onto a surface rendered at scale.
+
+    Offers the Surface.blit the game uses, and rect, line and circle in
+    place of the pygame.draw functions. Images are scaled the first time
+    they are drawn and kept for as long as they exist, so an image must not
+    change after it has been drawn.
+    """
+
+    def __init__(self, surface, scale):
+        self.surface = surface
+        self.scale = scale
+        self._images = weakref.WeakKeyDictionary()
+        if scale == 1:
+            # Nothing to map; draw straight onto the surface
+            self.blit = surface.blit
+            self.rect = functools.partial(pygame.draw.rect, surface)
+            self.line = functools.partial(pygame.draw.line, surface)
+            self.circle = functools.partial(pygame.draw.circle, surface)
+
+    def image(self, image):
+        """image scaled to the canvas resolution."""
+        scaled = self._images.get(image)
+        if scaled is None:
+            width, height = image.get_size()
+            size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+            scaled = self._images[image] = scale_image(image, size)
+        return scaled
+
+    def _rect(self, rect):
+        # Scale the edges rather than the size, so rects that touch still do
+        scale = self.scale
+        left, top = round(rect[0] * scale), round(rect[1] * scale)
+        return (left, top, round((rect[0] + rect[2]) * scale) - left,
+                round((rect[1] + rect[3]) * scale) - top)
+
+    # The drawing methods run many times a frame, so they do their own
+    # arithmetic rather than call helpers
+    def blit(self, source, dest, area=None, special_flags=0):
+        scale = self.scale
+        if area is not None:
+            area = self._rect(area)
+        self.surface.blit(self.image(source), (round(dest[0] * scale), round(dest[1] * scale)), area,
+                          special_flags)
+
+    def rect(self, color, rect, width=0):
+        pygame.draw.rect(self.surface, color, self._rect(rect), width and max(1, round(width * self.scale)))
+
+    def line(self, color, start, end, width=1):
+        scale = self.scale
+        pygame.draw.line(self.surface, color, (round(start[0] * scale), round(start[1] * scale)),
+                         (round(end[0] * scale), round(end[1] * scale)), width and max(1, round(width * scale)))
+
+    def circle(self, color, center, radius, width=0):
+        scale = self.scale
+        pygame.draw.circle(self.surface, color, (round(center[0] * scale), round(center[1] * scale)),
+                           max(1, round(radius * scale)), width and max(1, round(width * scale)))
+
+
+class Renderer:
+    def __init__(self, logical_size, window_size=None, fullscreen=False, smooth=False, render_scale=1.0):
+        """
+        render_scale: the canvas resolution as a fraction of the logical size
+        """
+        self.logical_size = logical_size
+        self.render_scale = render_scale
+        self.render_size = (max(1, round(logical_size[0] * render_scale)),
+                            max(1, round(logical_size[1] * render_scale)))
+        self.smooth = smooth
+        self.fullscreen = fullscreen
+        if fullscreen:
+            self.display = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.display = pygame.display.set_mode(window_size or logical_size, pygame.RESIZABLE)
+        self.canvas = None  # the surface drawn to, at render_size
+        self.view = None  # a Canvas drawing onto it in logical coordinates
+        self.resize()
+
+    def resize(self, size=None):
+        """Fit the window after it changed size; returns the view to draw with."""
+        if size is not None and not self.fullscreen:
+            self.display = pygame.display.set_mode(size, pygame.RESIZABLE)
+        else:
+            self.display = pygame.display.get_surface()
+
+        window_w, window_h = self.display.get_size()
+        logical_w, logical_h = self.logical_size
+        scale = min(window_w / logical_w, window_h / logical_h)
+        self.scale = scale
+        self.target = pygame.Rect(0, 0, max(1, int(logical_w * scale)), max(1, int(logical_h * scale)))
+        self.target.center = (window_w // 2, window_h // 2)
+
+        canvas = self.canvas
+        if self.display.get_size() == self.render_size:
+            # Draw straight into the window; nothing to scale
+            self.direct = True
+            canvas = self.display
+            self._scaled = None
+        else:
+            self.direct = False
+            if canvas is None or canvas is self.display:
+                canvas = pygame.Surface(self.render_size).convert()
+            self.display.fill((0, 0, 0))
+            self._scaled = self.display.subsurface(self.target)
+        if canvas is not self.canvas:
+            self.canvas = canvas
+            self.view = Canvas(canvas, self.render_scale)
+        return self.view
+
+    def present(self):
+        if not self.direct:
+            # Scale straight into the window's letterboxed area
+            if self.smooth and self.display.get_bitsize() in (24, 32):
+                pygame.transform.smoothscale(self.canvas, self.target.size, self._scaled)
+            else:
+                pygame.transform.scale(self.canvas, self.target.size, self._scaled)
+        pygame.display.flip()
+
+    def to_logical(self, pos):
+        """Map a window position (e.g. the mouse) to logical coordinates."""
+        if self.direct and self.render_scale == 1:
+            return pos
+        return (int((pos[0] - self.target.x) / self.scale),
+                int((pos[1] - self.target.y) / self.scale))
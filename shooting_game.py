@@ -9,7 +9,24 @@ import random
 import sys
 import os
 import math
+import atexit
+import argparse
 from pygame import mixer
+from snapshot import SnapshotCodec, RewindBuffer, POWER_UP_TYPES
+from leaderboard import Leaderboard
+from audio import AudioEngine
+from text_renderer import TextRenderer
+from quality import QualityGovernor
+from renderer import Renderer
+from collision import SpriteShape, scaled_shapes, rect_mask, masks_overlap
+from game_clock import GameClock, TimerScheduler
+import telemetry as events
+from telemetry import Telemetry
+from alloc_profiler import AllocationProfiler
+from capture import FrameCapture, DEFAULT_ENCODER
+from latency import InputLatency, FramePacer, INPUT_EVENTS
+from bloom import Bloom
+from starfield import Starfield
 
 # Initialize Pygame and mixer
 pygame.init()
@@ -20,12 +37,31 @@ title_font = pygame.font.Font(None, 74)
 font = pygame.font.Font(None, 36)
 small_font = pygame.font.Font(None, 24)
 
-# Set up the game window
+# Set up the game window. WIDTH and HEIGHT are the logical canvas size that
+# everything is drawn at; the canvas is scaled to the window in one step.
 WIDTH = 800
 HEIGHT = 600
-window = pygame.display.set_mode((WIDTH, HEIGHT))
+WINDOW_SIZE = (WIDTH, HEIGHT)
+FULLSCREEN = False
+SMOOTH_SCALING = False
+# Canvas resolution as a fraction of the logical size; 0.5 renders a
+# quarter of the pixels and upscales, for machines without a fast GPU
+RENDER_SCALE = 1.0
+renderer = Renderer((WIDTH, HEIGHT), WINDOW_SIZE, FULLSCREEN, SMOOTH_SCALING, RENDER_SCALE)
+window = renderer.view
 pygame.display.set_caption("Space Shooter")
 
+# Text is drawn from cached glyph atlases instead of font.render
+text_renderer = TextRenderer()
+
+# Glow post-process; glowing things are tagged while drawing and blurred
+# onto the canvas once per frame
+bloom = Bloom((WIDTH, HEIGHT))
+
+# Procedural background, generated strip by strip as it scrolls into view
+STARFIELD_SEED = None  # None picks a new sky every run
+starfield = Starfield((WIDTH, HEIGHT), STARFIELD_SEED)
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -49,16 +85,75 @@ def load_image(name):
 player_img = load_image('spaceship.png')
 enemy_img = load_image('enemy.png')
 laser_img = load_image('laser.png')
-background_img = load_image('background.png')
 powerup_img = load_image('powerup.png')
 explosion_frames = [load_image(f'explosion_{i}.png') for i in range(8)]
 
+# Collision shapes, built once. The power-up pulse is pre-scaled into steps
+# so both drawing and collisions use the same cached variant.
+PRECISE_COLLISIONS = True
+POWERUP_PULSE_STEPS = 16
+player_shape = SpriteShape(player_img)
+enemy_shape = SpriteShape(enemy_img)
+powerup_shapes = scaled_shapes(powerup_img, [1 + 0.2 * i / (POWERUP_PULSE_STEPS - 1)
+                                             for i in range(POWERUP_PULSE_STEPS)])
+
 # Player settings
 PLAYER_SPEED = 5
+SHOT_DELAY = 250
+COMBO_TIMEOUT = 2000
 player_rect = player_img.get_rect()
 player_rect.centerx = WIDTH // 2
 player_rect.bottom = HEIGHT - 10
 
+# Game time stops while paused; timers and cooldowns all run on it
+game_clock = GameClock()
+timers = TimerScheduler()
+
+# Rewind settings
+REWIND_SECONDS = 10
+REWIND_MEMORY_BUDGET = 4 * 1024 * 1024  # bytes
+CRASH_DUMP_FILE = 'crash_dump.bin'
+rewind_buffer = None
+
+# Leaderboard files
+LEADERBOARD_LOG = 'leaderboard.log'
+LEADERBOARD_INDEX = 'leaderboard.idx'
+
+# Render quality adapts to the frame-time budget
+governor = QualityGovernor()
+
+# Allocation profiling is off unless started with --profile-alloc
+profiler = AllocationProfiler()
+
+# Frame pacing: with LOW_LATENCY the loop sleeps before reading input
+# instead of after drawing (--low-latency)
+FPS = 60
+LOW_LATENCY = False
+
+# Input-to-present latency is measured with --latency
+latency = InputLatency()
+
+# Gameplay capture (--capture / --capture-video); frames are dropped when
+# all slots are still waiting to be encoded
+CAPTURE_SLOTS = 12
+CAPTURE_WORKERS = 2
+CAPTURE_ENCODER = DEFAULT_ENCODER
+capture = None
+
+# Telemetry settings; sample rates map event types to the fraction kept
+TELEMETRY_ENABLED = True
+TELEMETRY_DIR = 'telemetry'
+TELEMETRY_SAMPLE_RATES = {}
+
+# Sound settings: channels reserved per category, and effect -> (file, category, volume)
+SOUND_GROUPS = {'laser': 4, 'explosion': 6, 'hit': 2, 'powerup': 2}
+SOUND_EFFECTS = {
+    'laser': ('laser.wav', 'laser', 0.3),
+    'explosion': ('explosion.wav', 'explosion', 0.6),
+    'hit': ('hit.wav', 'hit', 0.8),
+    'powerup': ('powerup.wav', 'powerup', 0.7),
+}
+
 # Game classes
 class UIElement:
     def __init__(self, x, y, width, height, text, font, base_color, hover_color, alpha=255):
@@ -71,41 +166,33 @@ class UIElement:
         self.is_hovered = False
         self.animation_progress = 0
         self.glow_size = 0
+        self._surface = None
+        self._surface_hovered = None
     
     def draw(self, surface):
-        # Draw button background with glow effect
-        glow_rect = self.rect.inflate(self.glow_size, self.glow_size)
-        s = pygame.Surface((glow_rect.width, glow_rect.height), pygame.SRCALPHA)
-        
-        # Create gradient glow
-        for i in range(10):
-            size = i * 2
-            r = self.rect.inflate(size, size)
-            r.center = glow_rect.width//2, glow_rect.height//2
-            color = self.hover_color if self.is_hovered else self.base_color
-            color = (*color, 25 - i * 2)
-            pygame.draw.rect(s, color, r, border_radius=10)
-        
-        # Draw main button
         color = self.hover_color if self.is_hovered else self.base_color
-        pygame.draw.rect(s, (*color, self.alpha), self.rect.move(-self.rect.x, -self.rect.y), 
-                        border_radius=10)
+        # Glow grows with the hover animation
+        if self.glow_size:
+            bloom.add_rect(self.rect.inflate(self.glow_size, self.glow_size), color, self.glow_size / 40)
         
-        # Draw text with glow
-        text_surf = self.font.render(self.text, True, WHITE)
-        text_rect = text_surf.get_rect(center=self.rect.move(-self.rect.x, -self.rect.y).center)
+        # Only rebuild the button image when its look changes
+        if self.is_hovered != self._surface_hovered:
+            self._surface = self._render(color)
+            self._surface_hovered = self.is_hovered
+        surface.blit(self._surface, self.rect)
+    
+    def _render(self, color):
+        s = pygame.Surface(self.rect.size, pygame.SRCALPHA)
         
-        # Add text glow
-        glow_surf = self.font.render(self.text, True, (*color, 150))
-        for dx, dy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-            s.blit(glow_surf, text_rect.move(dx, dy))
-        s.blit(text_surf, text_rect)
+        # Draw main button
+        pygame.draw.rect(s, (*color, self.alpha), s.get_rect(), border_radius=10)
         
-        # Draw on main surface
-        surface.blit(s, glow_rect)
+        # Draw text
+        text_renderer.draw(s, self.text, s.get_rect().center, self.font, WHITE, center=True, cache=True)
+        return s
     
     def update(self):
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = renderer.to_logical(pygame.mouse.get_pos())
         self.is_hovered = self.rect.collidepoint(mouse_pos)
         
         # Update glow animation
@@ -144,7 +231,7 @@ class Enemy:
 class PowerUp:
     def __init__(self, x, y):
         self.rect = pygame.Rect(x, y, powerup_img.get_width(), powerup_img.get_height())
-        self.type = random.choice(['health', 'shield', 'rapid_fire', 'double_damage', 'speed_boost'])
+        self.type = random.choice(POWER_UP_TYPES)
         self.duration = 10000
         self.start_time = 0
 
@@ -169,9 +256,12 @@ class Explosion:
 class Game:
     def __init__(self):
         self.high_score = 0
+        self.score = 0
         self.reset()
     
     def reset(self):
+        # Update high score before the score is cleared
+        self.high_score = max(self.high_score, self.score)
         self.game_state = WELCOME
         self.score = 0
         self.wave_number = 1
@@ -196,48 +286,93 @@ class Game:
         self.double_damage_end = 0
         self.speed_boost = False
         self.speed_boost_end = 0
-        # Update high score when resetting
-        self.high_score = max(self.high_score, self.score)
+        self.spawn_ready = True
+        self.shot_ready = True
+        self.rank = 0
+        timers.clear()
+
+# Buttons for the menu screens
+start_button = UIElement(WIDTH//2 - 100, HEIGHT//2, 200, 50, "START GAME", font, (0, 100, 200), (0, 150, 255))
+quit_button = UIElement(WIDTH//2 - 100, HEIGHT//2 + 70, 200, 50, "QUIT", font, (200, 0, 0), (255, 0, 0))
+restart_button = UIElement(WIDTH//2 - 200, HEIGHT - 100, 180, 50, "PLAY AGAIN", font, (0, 100, 200), (0, 150, 255))
+game_over_quit_button = UIElement(WIDTH//2 + 20, HEIGHT - 100, 180, 50, "QUIT", font, (200, 0, 0), (255, 0, 0))
+
+# Static surfaces (HUD background, overlays, panels), built on first use
+surface_cache = {}
+
+def cached_surface(key, build):
+    surface = surface_cache.get(key)
+    if surface is None:
+        surface = surface_cache[key] = build()
+    return surface
 
 def clamp(value, min_value=0, max_value=255):
     return max(min_value, min(max_value, int(value)))
 
+def collides(rect_a, mask_a, rect_b, mask_b):
+    # Bounding boxes first; masks only for pairs that already touch
+    if not rect_a.colliderect(rect_b):
+        return False
+    return not PRECISE_COLLISIONS or masks_overlap(rect_a, mask_a, rect_b, mask_b)
+
+def powerup_shape():
+    # Current pulse step of the power-up animation
+    if not governor.tier.pulse_scaling:
+        return powerup_shapes[0]
+    pulse = abs(math.sin(game_clock.now() * 0.005))
+    return powerup_shapes[int(pulse * (POWERUP_PULSE_STEPS - 1) + 0.5)]
+
 def update_game_objects():
+    # Lists are walked backwards by index so items can be deleted in place
+    # without copying the list every frame
+    
     # Update laser positions
-    for laser in game.lasers[:]:
+    lasers = game.lasers
+    for i in range(len(lasers) - 1, -1, -1):
+        laser = lasers[i]
         laser.move()
         if laser.rect.bottom < 0:
-            game.lasers.remove(laser)
+            del lasers[i]
     
-    for laser in game.enemy_lasers[:]:
+    lasers = game.enemy_lasers
+    for i in range(len(lasers) - 1, -1, -1):
+        laser = lasers[i]
         laser.move()
         if laser.rect.top > HEIGHT:
-            game.enemy_lasers.remove(laser)
+            del lasers[i]
     
     # Update enemy positions
-    for enemy in game.enemies[:]:
+    enemies = game.enemies
+    for i in range(len(enemies) - 1, -1, -1):
+        enemy = enemies[i]
         # Smoother enemy movement
         enemy.rect.y += enemy.speed
         if enemy.rect.top > HEIGHT:
-            if enemy in game.enemies:  # Check if enemy still exists
-                game.enemies.remove(enemy)
-                game.player_health -= 5  # Reduced penalty for missed enemies
-                if game.player_health <= 0:
-                    game.game_state = GAME_OVER
+            del enemies[i]
+            game.player_health -= 5  # Reduced penalty for missed enemies
+            telemetry.record(events.DAMAGE, game_clock.now(), events.DAMAGE_MISSED_ENEMY, 5, 0)
+            if game.player_health <= 0:
+                game.game_state = GAME_OVER
     
     # Update power-up positions
-    for power_up in game.power_ups[:]:
+    power_ups = game.power_ups
+    for i in range(len(power_ups) - 1, -1, -1):
+        power_up = power_ups[i]
         power_up.rect.y += 2
         if power_up.rect.top > HEIGHT:
-            game.power_ups.remove(power_up)
+            del power_ups[i]
     
-    # Update explosions
-    for explosion in game.explosions[:]:
-        if explosion.frame >= len(explosion_frames):
-            game.explosions.remove(explosion)
+    # Advance explosion animations, dropping finished ones
+    explosions = game.explosions
+    for i in range(len(explosions) - 1, -1, -1):
+        if not explosions[i].update():
+            del explosions[i]
+    
+    # Drop the oldest explosions beyond the current quality cap
+    if len(game.explosions) > governor.tier.particle_cap:
+        del game.explosions[:-governor.tier.particle_cap]
     
     # Enemy shooting
-    current_time = pygame.time.get_ticks()
     for enemy in game.enemies:
         if game.level >= 3 and random.random() < 0.002:  # Reduced shooting frequency
             laser = Laser(
@@ -255,26 +390,54 @@ def update_game_objects():
         game.level = (game.wave_number - 1) // 2 + 1
         game.enemies_killed_in_wave = 0
         game.enemies_per_wave = min(10 + game.wave_number * 2, 30)
-    
-    # Update power-up effects
-    current_time = pygame.time.get_ticks()
-    if game.rapid_fire and current_time > game.rapid_fire_end:
-        game.rapid_fire = False
-    if game.double_damage and current_time > game.double_damage_end:
-        game.double_damage = False
-    if game.speed_boost and current_time > game.speed_boost_end:
-        game.speed_boost = False
-    
-    # Update combo system
-    if current_time - game.combo_timer > 2000:
-        game.kills_in_combo = 0
-        game.combo_multiplier = 1
+        telemetry.record(events.WAVE, game_clock.now(), game.wave_number, game.level, game.score)
+
+# Timer callbacks; power-up and combo expiry no longer poll the clock every frame
+def end_rapid_fire():
+    game.rapid_fire = False
+
+def end_double_damage():
+    game.double_damage = False
+
+def end_speed_boost():
+    game.speed_boost = False
+
+def end_combo():
+    game.kills_in_combo = 0
+    game.combo_multiplier = 1
+
+def mark_spawn_ready():
+    game.spawn_ready = True
+
+def mark_shot_ready():
+    game.shot_ready = True
+
+def spawn_delay():
+    return max(2000 - (game.level * 200), 500)  # Decrease delay with level, but not below 500ms
+
+def shot_delay():
+    return SHOT_DELAY / 2 if game.rapid_fire else SHOT_DELAY
+
+def schedule_game_timers():
+    # Rebuild every timer from the game's timestamps, e.g. after a rewind
+    timers.clear()
+    if game.rapid_fire:
+        timers.set('rapid_fire', game.rapid_fire_end, end_rapid_fire)
+    if game.double_damage:
+        timers.set('double_damage', game.double_damage_end, end_double_damage)
+    if game.speed_boost:
+        timers.set('speed_boost', game.speed_boost_end, end_speed_boost)
+    if game.kills_in_combo:
+        timers.set('combo', game.combo_timer + COMBO_TIMEOUT, end_combo)
+    game.spawn_ready = False
+    timers.set('spawn', game.last_spawn_time + spawn_delay(), mark_spawn_ready)
+    game.shot_ready = False
+    timers.set('shot', last_shot_time + shot_delay(), mark_shot_ready)
 
 def spawn_enemy():
-    current_time = pygame.time.get_ticks()
+    current_time = game_clock.now()
     # Only spawn if enough time has passed (based on level)
-    spawn_delay = max(2000 - (game.level * 200), 500)  # Decrease delay with level, but not below 500ms
-    if current_time - game.last_spawn_time < spawn_delay:
+    if not game.spawn_ready:
         return
     
     # Limit number of enemies on screen
@@ -306,61 +469,97 @@ def spawn_enemy():
             enemy = Enemy(x, -enemy_img.get_height(), game.level)
             game.enemies.append(enemy)
             game.last_spawn_time = current_time
+            game.spawn_ready = False
+            timers.set('spawn', current_time + spawn_delay(), mark_spawn_ready)
             break
 
 def check_collisions():
-    current_time = pygame.time.get_ticks()
+    current_time = game_clock.now()
     
     # Player collision with enemy lasers
-    player_rect_reduced = player_rect.inflate(-20, -20)  # Smaller hitbox for player
-    for laser in game.enemy_lasers[:]:
-        if laser in game.enemy_lasers and player_rect_reduced.colliderect(laser.rect):
-            game.enemy_lasers.remove(laser)
+    if PRECISE_COLLISIONS:
+        player_rect_reduced = player_rect
+    else:
+        player_rect_reduced = player_rect.inflate(-20, -20)  # Smaller hitbox for player
+    player_mask = player_shape.mask
+    enemy_lasers = game.enemy_lasers
+    for i in range(len(enemy_lasers) - 1, -1, -1):
+        laser = enemy_lasers[i]
+        if collides(player_rect_reduced, player_mask, laser.rect, rect_mask(laser.rect.size)):
+            del enemy_lasers[i]
+            audio.play('hit', priority=3)
             if game.player_shield > 0:
                 game.player_shield -= 1
+                telemetry.record(events.DAMAGE, current_time, events.DAMAGE_LASER, 0, 1)
             else:
                 game.player_health -= 10
+                telemetry.record(events.DAMAGE, current_time, events.DAMAGE_LASER, 10, 0)
                 if game.player_health <= 0:
                     game.game_state = GAME_OVER
     
     # Player collision with enemies
-    for enemy in game.enemies[:]:
-        if enemy in game.enemies and player_rect_reduced.colliderect(enemy.rect):
+    enemies = game.enemies
+    for i in range(len(enemies) - 1, -1, -1):
+        enemy = enemies[i]
+        if collides(player_rect_reduced, player_mask, enemy.rect, enemy_shape.mask):
+            audio.play('hit', priority=3)
             if game.player_shield > 0:
                 game.player_shield -= 1
-                game.enemies.remove(enemy)
+                telemetry.record(events.DAMAGE, current_time, events.DAMAGE_COLLISION, 0, 1)
             else:
                 game.player_health -= 20
+                telemetry.record(events.DAMAGE, current_time, events.DAMAGE_COLLISION, 20, 0)
                 if game.player_health <= 0:
                     game.game_state = GAME_OVER
-            if enemy in game.enemies:
-                game.enemies.remove(enemy)
-    
-    # Laser collision with enemies
-    for laser in game.lasers[:]:
-        for enemy in game.enemies[:]:
-            if laser in game.lasers and enemy in game.enemies and laser.colliderect(enemy.rect):
-                if laser in game.lasers:
-                    game.lasers.remove(laser)
+            del enemies[i]
+    
+    # Laser collision with enemies; each laser hits at most one enemy
+    lasers = game.lasers
+    for i in range(len(lasers) - 1, -1, -1):
+        laser = lasers[i]
+        laser_mask = rect_mask(laser.rect.size)
+        for j in range(len(enemies) - 1, -1, -1):
+            enemy = enemies[j]
+            if collides(laser.rect, laser_mask, enemy.rect, enemy_shape.mask):
+                del lasers[i]
                 enemy.health -= laser.damage
-                if enemy.health <= 0 and enemy in game.enemies:
-                    game.enemies.remove(enemy)
+                if enemy.health <= 0:
+                    del enemies[j]
+                    audio.play('explosion', priority=2)
+                    frame_width, frame_height = explosion_frames[0].get_size()
+                    game.explosions.append(Explosion((enemy.rect.centerx - frame_width // 2,
+                                                      enemy.rect.centery - frame_height // 2)))
                     game.enemies_killed_in_wave += 1
-                    game.score += int(10 * game.level * game.combo_multiplier)
+                    points = int(10 * game.level * game.combo_multiplier)
+                    game.score += points
+                    telemetry.record(events.KILL, current_time, points, game.combo_multiplier, game.level)
                     
                     # Update combo
                     game.kills_in_combo += 1
-                    game.combo_multiplier = min(4, 1 + (game.kills_in_combo // 3))
+                    combo_multiplier = min(4, 1 + (game.kills_in_combo // 3))
+                    if combo_multiplier != game.combo_multiplier:
+                        telemetry.record(events.COMBO, current_time, combo_multiplier,
+                                         game.kills_in_combo, game.score)
+                    game.combo_multiplier = combo_multiplier
                     game.combo_timer = current_time
+                    timers.set('combo', current_time + COMBO_TIMEOUT, end_combo)
+                break
     
-    # Player collision with power-ups
-    for power_up in game.power_ups[:]:
-        if power_up in game.power_ups and player_rect_reduced.colliderect(power_up.rect):
+    # Player collision with power-ups, using the pulse step currently drawn
+    shape = powerup_shape()
+    power_ups = game.power_ups
+    for i in range(len(power_ups) - 1, -1, -1):
+        power_up = power_ups[i]
+        power_up_rect = shape.surface.get_rect(center=power_up.rect.center)
+        if collides(player_rect_reduced, player_mask, power_up_rect, shape.mask):
             apply_power_up(power_up)
-            game.power_ups.remove(power_up)
+            del power_ups[i]
+            audio.play('powerup', priority=3)
 
 def apply_power_up(power_up):
-    current_time = pygame.time.get_ticks()
+    current_time = game_clock.now()
+    telemetry.record(events.POWER_UP, current_time, POWER_UP_TYPES.index(power_up.type),
+                     game.player_health, game.player_shield)
     if power_up.type == 'health':
         game.player_health = min(100, game.player_health + 30)
     elif power_up.type == 'shield':
@@ -368,12 +567,15 @@ def apply_power_up(power_up):
     elif power_up.type == 'rapid_fire':
         game.rapid_fire = True
         game.rapid_fire_end = current_time + power_up.duration
+        timers.set('rapid_fire', game.rapid_fire_end, end_rapid_fire)
     elif power_up.type == 'double_damage':
         game.double_damage = True
         game.double_damage_end = current_time + power_up.duration
+        timers.set('double_damage', game.double_damage_end, end_double_damage)
     elif power_up.type == 'speed_boost':
         game.speed_boost = True
         game.speed_boost_end = current_time + power_up.duration
+        timers.set('speed_boost', game.speed_boost_end, end_speed_boost)
 
 def spawn_power_up():
     if random.random() < 0.001:
@@ -384,10 +586,10 @@ def spawn_power_up():
         game.power_ups.append(power_up)
 
 def draw_game():
-    # Draw background with parallax scrolling
-    rel_y = pygame.time.get_ticks() * 0.1 % HEIGHT
-    window.blit(background_img, (0, rel_y))
-    window.blit(background_img, (0, rel_y - HEIGHT))
+    bloom.begin_frame()
+    
+    # Draw the starfield, scrolling each layer at its own speed
+    starfield.draw(window, game_clock.now() if governor.tier.parallax else 0)
     
     if game.game_state == WELCOME:
         draw_welcome_screen()
@@ -397,61 +599,75 @@ def draw_game():
         
         # Draw lasers with color and trail
         for laser in game.lasers:
-            pygame.draw.rect(window, laser.color, laser.rect)
+            window.rect(laser.color, laser.rect)
         
         # Draw enemy lasers with trail
         for laser in game.enemy_lasers:
-            pygame.draw.rect(window, (255, 0, 0), laser.rect)
+            window.rect((255, 0, 0), laser.rect)
         
         # Draw enemies
         for enemy in game.enemies:
             window.blit(enemy_img, enemy.rect)
         
         # Draw power-ups with pulsing effect and particles
-        pulse = abs(math.sin(pygame.time.get_ticks() * 0.005)) * 0.2
+        scaled_powerup = powerup_shape().surface
         for power_up in game.power_ups:
-            scaled_powerup = pygame.transform.scale(powerup_img, 
-                (int(power_up.rect.width * (1 + pulse)), int(power_up.rect.height * (1 + pulse))))
             power_up_rect = scaled_powerup.get_rect(center=power_up.rect.center)
             window.blit(scaled_powerup, power_up_rect)
         
         # Draw explosions
-        for explosion in game.explosions[:]:
+        for explosion in game.explosions:
             explosion.draw(window)
         
         # Draw HUD
         draw_hud()
         
+        if game_clock.paused:
+            text_renderer.draw(window, "PAUSED", (WIDTH//2, HEIGHT//2), title_font, WHITE,
+                               center=True, cache=True)
+        
     elif game.game_state == GAME_OVER:
         draw_game_over_screen()
     
-    pygame.display.update()
+    bloom.composite(renderer.canvas, governor.tier.bloom_passes)
+    renderer.present()
 
-def draw_hud():
-    # Create semi-transparent HUD surface with gradient
+def make_hud_surface(gradient):
     hud_height = 60
     hud_surface = pygame.Surface((WIDTH, hud_height), pygame.SRCALPHA)
-    for i in range(hud_height):
-        alpha = clamp(128 * (1 - i/hud_height))
-        pygame.draw.line(hud_surface, (0, 0, 0, alpha), (0, i), (WIDTH, i))
-    window.blit(hud_surface, (0, 0))
-    
-    # Draw score and wave info
-    score_text = font.render(f"SCORE: {game.score}", True, WHITE)
-    level_text = font.render(f"WAVE: {game.wave_number}", True, WHITE)
-    combo_text = font.render(f"COMBO: x{game.combo_multiplier}", True, YELLOW)
-    
-    # Draw text with glow effect
-    for text, pos, color in [
-        (score_text, (20, 10), BLUE),
-        (level_text, (WIDTH - 120, 10), GREEN),
-        (combo_text, (WIDTH//2 - 50, 10), YELLOW)
-    ]:
-        # Draw glow
-        for dx, dy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-            window.blit(text, (pos[0] + dx, pos[1] + dy))
-        # Draw main text
-        window.blit(text, pos)
+    if gradient:
+        for i in range(hud_height):
+            alpha = clamp(128 * (1 - i/hud_height))
+            pygame.draw.line(hud_surface, (0, 0, 0, alpha), (0, i), (WIDTH, i))
+    else:
+        hud_surface.fill((0, 0, 0, 64))
+    return hud_surface
+
+def make_overlay(alpha):
+    overlay = pygame.Surface((WIDTH, HEIGHT))
+    overlay.fill((0, 0, 20))
+    overlay.set_alpha(alpha)
+    return overlay
+
+def make_panel(size):
+    panel = pygame.Surface(size)
+    panel.fill((0, 0, 40))
+    pygame.draw.rect(panel, (0, 100, 200), panel.get_rect(), 2)
+    return panel
+
+def draw_hud():
+    # Semi-transparent HUD background, with a gradient on higher tiers
+    gradient = governor.tier.hud_gradient
+    window.blit(cached_surface(('hud', gradient), lambda: make_hud_surface(gradient)), (0, 0))
+    
+    # Draw score and wave info with glow effect
+    score_rect = text_renderer.draw_counter(window, "SCORE: ", game.score, (20, 10), font, WHITE)
+    wave_rect = text_renderer.draw_counter(window, "WAVE: ", game.wave_number, (WIDTH - 120, 10), font, WHITE)
+    combo_rect = text_renderer.draw_counter(window, "COMBO: x", game.combo_multiplier, (WIDTH//2 - 50, 10), font, YELLOW)
+    if governor.tier.text_glow:
+        bloom.add_rect(score_rect, WHITE, 0.3)
+        bloom.add_rect(wave_rect, WHITE, 0.3)
+        bloom.add_rect(combo_rect, YELLOW, 0.3)
     
     # Draw health bar
     health_width = 200
@@ -460,19 +676,24 @@ def draw_hud():
     health_y = 35
     
     # Health bar background
-    pygame.draw.rect(window, (50, 50, 50), (health_x, health_y, health_width, health_height))
+    window.rect((50, 50, 50), (health_x, health_y, health_width, health_height))
     
     # Health bar fill with gradient
     health_percent = max(0, game.player_health / 100)
     health_fill = int(health_width * health_percent)
     
-    for i in range(health_fill):
-        progress = i / health_width
-        r = clamp(255 * (1 - health_percent))
-        g = clamp(255 * health_percent)
-        pygame.draw.line(window, (r, g, 0), 
+    if governor.tier.hud_gradient:
+        for i in range(health_fill):
+            progress = i / health_width
+            r = clamp(255 * (1 - health_percent))
+            g = clamp(255 * health_percent)
+            window.line((r, g, 0), 
                         (health_x + i, health_y),
                         (health_x + i, health_y + health_height))
+    else:
+        r = clamp(255 * (1 - health_percent))
+        g = clamp(255 * health_percent)
+        window.rect((r, g, 0), (health_x, health_y, health_fill, health_height))
     
     # Draw shield indicators
     for i in range(game.player_shield):
@@ -480,13 +701,10 @@ def draw_hud():
         shield_y = 35
         
         # Draw shield glow
-        for size in range(3, 0, -1):
-            alpha = clamp(128 / size)
-            pygame.draw.circle(window, (CYAN[0], CYAN[1], CYAN[2], alpha), 
-                             (shield_x, shield_y), 8 + size)
+        bloom.add_circle((shield_x, shield_y), 11, CYAN, 0.8)
         
         # Draw main shield
-        pygame.draw.circle(window, CYAN, (shield_x, shield_y), 8)
+        window.circle(CYAN, (shield_x, shield_y), 8)
     
     # Draw wave progress bar
     progress_width = 150
@@ -495,100 +713,82 @@ def draw_hud():
     progress_y = 35
     
     # Progress bar background
-    pygame.draw.rect(window, (50, 50, 50), 
-                    (progress_x, progress_y, progress_width, progress_height))
+    window.rect((50, 50, 50), 
+                (progress_x, progress_y, progress_width, progress_height))
     
     # Progress bar fill
     wave_progress = game.enemies_killed_in_wave / game.enemies_per_wave
     fill_width = int(progress_width * wave_progress)
     
-    for i in range(fill_width):
-        progress = i / progress_width
-        r = 0
-        g = clamp(255 * (1 - progress) + 200 * progress)
-        b = clamp(255 * progress)
-        pygame.draw.line(window, (r, g, b),
+    if governor.tier.hud_gradient:
+        for i in range(fill_width):
+            progress = i / progress_width
+            r = 0
+            g = clamp(255 * (1 - progress) + 200 * progress)
+            b = clamp(255 * progress)
+            window.line((r, g, b),
                         (progress_x + i, progress_y),
                         (progress_x + i, progress_y + progress_height))
+    else:
+        window.rect((0, 227, 128), (progress_x, progress_y, fill_width, progress_height))
     
     # Draw active power-ups
     power_up_x = WIDTH - 200
     power_up_y = 10
     
     if game.rapid_fire:
-        remaining = max(0, (game.rapid_fire_end - pygame.time.get_ticks()) / 1000)
+        remaining = max(0, (game.rapid_fire_end - game_clock.now()) / 1000)
         if remaining > 0:
-            text = small_font.render(f"RAPID FIRE {remaining:.1f}s", True, YELLOW)
-            window.blit(text, (power_up_x, power_up_y))
+            text_renderer.draw(window, f"RAPID FIRE {remaining:.1f}s", (power_up_x, power_up_y), small_font, YELLOW)
     
     if game.double_damage:
-        remaining = max(0, (game.double_damage_end - pygame.time.get_ticks()) / 1000)
+        remaining = max(0, (game.double_damage_end - game_clock.now()) / 1000)
         if remaining > 0:
-            text = small_font.render(f"DOUBLE DMG {remaining:.1f}s", True, RED)
-            window.blit(text, (power_up_x, power_up_y + 15))
+            text_renderer.draw(window, f"DOUBLE DMG {remaining:.1f}s", (power_up_x, power_up_y + 15), small_font, RED)
     
     if game.speed_boost:
-        remaining = max(0, (game.speed_boost_end - pygame.time.get_ticks()) / 1000)
+        remaining = max(0, (game.speed_boost_end - game_clock.now()) / 1000)
         if remaining > 0:
-            text = small_font.render(f"SPEED BOOST {remaining:.1f}s", True, GREEN)
-            window.blit(text, (power_up_x, power_up_y + 30))
+            text_renderer.draw(window, f"SPEED BOOST {remaining:.1f}s", (power_up_x, power_up_y + 30), small_font, GREEN)
+
+def make_controls_panel():
+    controls_surface = make_panel((300, 120))
+    text_renderer.draw(controls_surface, "CONTROLS", (20, 10), small_font, WHITE, cache=True)
+    text_renderer.draw(controls_surface, "← → Arrow Keys : Move", (20, 50), small_font, WHITE, cache=True)
+    text_renderer.draw(controls_surface, "SPACE : Shoot", (20, 80), small_font, WHITE, cache=True)
+    return controls_surface
 
 def draw_welcome_screen():
-    window.blit(background_img, (0, 0))
-    
-    # Create a semi-transparent overlay
-    overlay = pygame.Surface((WIDTH, HEIGHT))
-    overlay.fill((0, 0, 20))
-    overlay.set_alpha(128)
-    window.blit(overlay, (0, 0))
-    
-    # Draw title with glow effect
-    title_shadow = title_font.render("SPACE SHOOTER", True, (0, 100, 255))
-    title_text = title_font.render("SPACE SHOOTER", True, WHITE)
-    title_rect = title_text.get_rect(center=(WIDTH//2, HEIGHT//3))
-    
-    # Add multiple shadows for stronger glow effect
-    for offset in range(1, 4):
-        shadow_rect = title_rect.copy()
-        shadow_rect.x += offset
-        shadow_rect.y += offset
-        window.blit(title_shadow, shadow_rect)
+    # Semi-transparent overlay
+    window.blit(cached_surface(('overlay', 128), lambda: make_overlay(128)), (0, 0))
     
-    window.blit(title_text, title_rect)
-    
-    # Create buttons
-    start_button = UIElement(WIDTH//2 - 100, HEIGHT//2, 200, 50, "START GAME", font, (0, 100, 200), (0, 150, 255))
-    quit_button = UIElement(WIDTH//2 - 100, HEIGHT//2 + 70, 200, 50, "QUIT", font, (200, 0, 0), (255, 0, 0))
+    # Draw title with a blue glow
+    title_rect = text_renderer.draw(window, "SPACE SHOOTER", (WIDTH//2, HEIGHT//3), title_font, WHITE,
+                                    center=True, cache=True)
+    if governor.tier.title_glow:
+        bloom.add_rect(title_rect, (0, 100, 255))
     
     start_button.draw(window)
     quit_button.draw(window)
     
     # Draw controls in a nice box
-    controls_surface = pygame.Surface((300, 120))
-    controls_surface.fill((0, 0, 40))
-    pygame.draw.rect(controls_surface, (0, 100, 200), controls_surface.get_rect(), 2)
-    
-    controls_title = small_font.render("CONTROLS", True, WHITE)
-    move_text = small_font.render("← → Arrow Keys : Move", True, WHITE)
-    shoot_text = small_font.render("SPACE : Shoot", True, WHITE)
-    
-    controls_surface.blit(controls_title, (20, 10))
-    controls_surface.blit(move_text, (20, 50))
-    controls_surface.blit(shoot_text, (20, 80))
-    
-    window.blit(controls_surface, (WIDTH//2 - 150, HEIGHT - 150))
+    window.blit(cached_surface('controls', make_controls_panel), (WIDTH//2 - 150, HEIGHT - 150))
     
     if game.high_score > 0:
-        high_score_text = font.render(f"HIGH SCORE: {game.high_score}", True, YELLOW)
-        high_score_rect = high_score_text.get_rect(center=(WIDTH//2, HEIGHT - 200))
-        window.blit(high_score_text, high_score_rect)
+        text_renderer.draw(window, f"HIGH SCORE: {game.high_score}", (WIDTH//2, HEIGHT - 200),
+                           font, YELLOW, center=True, cache=True)
+    
+    # Draw top scores from the leaderboard
+    top_scores = leaderboard.top(5)
+    if top_scores:
+        text_renderer.draw(window, "TOP SCORES", (30, HEIGHT//2), small_font, YELLOW, cache=True)
+        for i, (score, wave_number, level, timestamp) in enumerate(top_scores):
+            text_renderer.draw(window, f"{i + 1}. {score}  (wave {wave_number})",
+                               (30, HEIGHT//2 + 30 + i * 25), small_font, WHITE, cache=True)
 
 def draw_game_over_screen():
     # Keep the game view in the background
-    overlay = pygame.Surface((WIDTH, HEIGHT))
-    overlay.fill((0, 0, 20))
-    overlay.set_alpha(180)
-    window.blit(overlay, (0, 0))
+    window.blit(cached_surface(('overlay', 180), lambda: make_overlay(180)), (0, 0))
     
     # Draw game over message with glow effect
     if game.player_health <= 0:
@@ -598,78 +798,144 @@ def draw_game_over_screen():
         text = "VICTORY!"
         color = GREEN
     
-    game_over_text = title_font.render(text, True, color)
-    text_rect = game_over_text.get_rect(center=(WIDTH//2, HEIGHT//3))
-    
-    # Add glow effect
-    for offset in range(1, 4):
-        shadow = title_font.render(text, True, (*color[:3], 128))
-        shadow_rect = text_rect.copy()
-        shadow_rect.x += offset
-        shadow_rect.y += offset
-        window.blit(shadow, shadow_rect)
+    title_rect = text_renderer.draw(window, text, (WIDTH//2, HEIGHT//3), title_font, color,
+                                    center=True, cache=True)
+    if governor.tier.title_glow:
+        bloom.add_rect(title_rect, color, 0.6)
     
-    window.blit(game_over_text, text_rect)
+    # Draw the stats box, then the stats straight onto the window
+    stats_x, stats_y = WIDTH//2 - 150, HEIGHT//2
+    window.blit(cached_surface('stats', lambda: make_panel((300, 200))), (stats_x, stats_y))
+    text_renderer.draw_counter(window, "Score: ", game.score, (stats_x + 20, stats_y + 20), font, WHITE)
+    text_renderer.draw_counter(window, "Level: ", game.level, (stats_x + 20, stats_y + 60), font, WHITE)
+    text_renderer.draw_counter(window, "High Score: ", game.high_score, (stats_x + 20, stats_y + 100), font, YELLOW)
     
-    # Create a stats box
-    stats_surface = pygame.Surface((300, 200))
-    stats_surface.fill((0, 0, 40))
-    pygame.draw.rect(stats_surface, (0, 100, 200), stats_surface.get_rect(), 2)
+    if game.rank:
+        text_renderer.draw_counter(window, "Rank: #", game.rank, (stats_x + 20, stats_y + 140), font, WHITE)
     
-    # Draw stats
-    score_text = font.render(f"Score: {game.score}", True, WHITE)
-    level_text = font.render(f"Level: {game.level}", True, WHITE)
-    high_score_text = font.render(f"High Score: {game.high_score}", True, YELLOW)
+    restart_button.draw(window)
+    game_over_quit_button.draw(window)
+
+def run_game_step(keys, codec):
+    global last_shot_time
     
-    stats_surface.blit(score_text, (20, 20))
-    stats_surface.blit(level_text, (20, 60))
-    stats_surface.blit(high_score_text, (20, 100))
+    current_time = game_clock.now()
+    profiler.mark("timers")
+    timers.run_due(current_time)
     
-    window.blit(stats_surface, (WIDTH//2 - 150, HEIGHT//2))
+    if game.game_state == PLAYING:
+        profiler.mark("input")
+        
+        # Player movement
+        if keys[pygame.K_LEFT] and player_rect.left > 0:
+            player_rect.x -= game.player_speed * (1.5 if game.speed_boost else 1)
+        if keys[pygame.K_RIGHT] and player_rect.right < WIDTH:
+            player_rect.x += game.player_speed * (1.5 if game.speed_boost else 1)
+        if keys[pygame.K_UP] and player_rect.top > 0:
+            player_rect.y -= game.player_speed * (1.5 if game.speed_boost else 1)
+        if keys[pygame.K_DOWN] and player_rect.bottom < HEIGHT:
+            player_rect.y += game.player_speed * (1.5 if game.speed_boost else 1)
+        
+        # Shooting
+        if keys[pygame.K_SPACE] and game.shot_ready:
+            laser = Laser(
+                player_rect.centerx - 2,
+                player_rect.top,
+                (0, 255, 0),
+                -10,
+                20 if game.double_damage else 10
+            )
+            game.lasers.append(laser)
+            last_shot_time = current_time
+            game.shot_ready = False
+            timers.set('shot', current_time + shot_delay(), mark_shot_ready)
+            audio.play('laser', priority=1)
+        
+        # Spawn enemies and power-ups
+        profiler.mark("spawn")
+        spawn_enemy()
+        spawn_power_up()
+        
+        # Update game state
+        profiler.mark("update")
+        update_game_objects()
+        profiler.mark("collisions")
+        check_collisions()
+        
+        if game.game_state == GAME_OVER:
+            telemetry.record(events.DEATH, current_time, game.score, game.wave_number, game.level)
+            game.high_score = max(game.high_score, game.score)
+            game.rank = leaderboard.submit(game.score, game.wave_number, game.level)
+        
+        profiler.mark("snapshot")
+        rewind_buffer.push(codec.pack(game, player_rect, last_shot_time, current_time), current_time)
+
+def init_game():
+    global game, player_rect, last_shot_time, rewind_buffer, leaderboard, audio, telemetry
     
-    # Create buttons
-    restart_button = UIElement(WIDTH//2 - 200, HEIGHT - 100, 180, 50, "PLAY AGAIN", font, (0, 100, 200), (0, 150, 255))
-    quit_button = UIElement(WIDTH//2 + 20, HEIGHT - 100, 180, 50, "QUIT", font, (200, 0, 0), (255, 0, 0))
+    # Decode all sound effects up front
+    audio = AudioEngine(SOUND_GROUPS, SOUND_EFFECTS)
     
-    restart_button.draw(window)
-    quit_button.draw(window)
-
-def main():
-    global game, player_rect, last_shot_time
+    # Writes go through a background thread; flush them on exit
+    leaderboard = Leaderboard(LEADERBOARD_LOG, LEADERBOARD_INDEX)
+    atexit.register(leaderboard.close)
     
-    pygame.init()
-    pygame.display.set_caption("Space Shooter")
+    # Gameplay events are written by a background thread too
+    telemetry = Telemetry(TELEMETRY_DIR, sample_rates=TELEMETRY_SAMPLE_RATES, enabled=TELEMETRY_ENABLED)
+    atexit.register(telemetry.close)
     
     game = Game()
+    game.high_score = leaderboard.best()
     player_rect = player_img.get_rect()
     player_rect.centerx = WIDTH // 2
     player_rect.bottom = HEIGHT - 20
     
     last_shot_time = 0
-    shot_delay = 250
     
-    # Create buttons for menu screens
-    start_button = UIElement(WIDTH//2 - 100, HEIGHT//2, 200, 50, "START GAME", font, (0, 100, 200), (0, 150, 255))
-    quit_button = UIElement(WIDTH//2 - 100, HEIGHT//2 + 70, 200, 50, "QUIT", font, (200, 0, 0), (255, 0, 0))
-    restart_button = UIElement(WIDTH//2 - 200, HEIGHT - 100, 180, 50, "PLAY AGAIN", font, (0, 100, 200), (0, 150, 255))
-    game_over_quit_button = UIElement(WIDTH//2 + 20, HEIGHT - 100, 180, 50, "QUIT", font, (200, 0, 0), (255, 0, 0))
+    # Keep recent frames for rewinding and crash dumps
+    rewind_buffer = RewindBuffer(REWIND_SECONDS * 60, REWIND_MEMORY_BUDGET)
+    return SnapshotCodec(Laser, Enemy, PowerUp, Explosion)
+
+def main():
+    global last_shot_time, window
     
-    clock = pygame.time.Clock()
+    pygame.init()
+    pygame.display.set_caption("Space Shooter")
+    
+    codec = init_game()
+    
+    pacer = FramePacer(FPS, late_latch=LOW_LATENCY)
     
     while True:
-        current_time = pygame.time.get_ticks()
+        # In low-latency mode this sleeps until just before input is read
+        frame_ms = pacer.begin_frame()
+        profiler.begin_frame()
+        game_clock.advance(frame_ms)
+        current_time = game_clock.now()
         
+        input_events = 0
         for event in pygame.event.get():
+            if event.type in INPUT_EVENTS:
+                input_events += 1
+            
             if event.type == pygame.QUIT:
                 pygame.quit()
                 return
             
+            if event.type == pygame.VIDEORESIZE:
+                window = renderer.resize(event.size)
+            
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_p and game.game_state == PLAYING:
+                game_clock.toggle_pause()
+            
             if game.game_state == WELCOME:
                 start_button.update()
                 quit_button.update()
                 if start_button.handle_event(event):
                     game.reset()
                     game.game_state = PLAYING
+                    game_clock.paused = False
+                    rewind_buffer.clear()
                 elif quit_button.handle_event(event):
                     pygame.quit()
                     return
@@ -680,52 +946,85 @@ def main():
                 if restart_button.handle_event(event):
                     game.reset()
                     game.game_state = PLAYING
+                    game_clock.paused = False
+                    rewind_buffer.clear()
                 elif game_over_quit_button.handle_event(event):
                     pygame.quit()
                     return
+        latency.polled(input_events)
         
         if game.game_state == PLAYING:
             keys = pygame.key.get_pressed()
             
-            # Player movement
-            if keys[pygame.K_LEFT] and player_rect.left > 0:
-                player_rect.x -= game.player_speed * (1.5 if game.speed_boost else 1)
-            if keys[pygame.K_RIGHT] and player_rect.right < WIDTH:
-                player_rect.x += game.player_speed * (1.5 if game.speed_boost else 1)
-            if keys[pygame.K_UP] and player_rect.top > 0:
-                player_rect.y -= game.player_speed * (1.5 if game.speed_boost else 1)
-            if keys[pygame.K_DOWN] and player_rect.bottom < HEIGHT:
-                player_rect.y += game.player_speed * (1.5 if game.speed_boost else 1)
-            
-            # Shooting
-            if keys[pygame.K_SPACE] and current_time - last_shot_time > (shot_delay / 2 if game.rapid_fire else shot_delay):
-                laser = Laser(
-                    player_rect.centerx - 2,
-                    player_rect.top,
-                    (0, 255, 0),
-                    -10,
-                    20 if game.double_damage else 10
-                )
-                game.lasers.append(laser)
-                last_shot_time = current_time
-                try:
-                    laser_sound.play()
-                except:
-                    pass
-            
-            # Spawn enemies and power-ups
-            spawn_enemy()
-            spawn_power_up()
-            
-            # Update game state
-            update_game_objects()
-            check_collisions()
+            if keys[pygame.K_r]:
+                # Rewind one frame per frame while R is held
+                frame = rewind_buffer.step_back()
+                if frame is not None:
+                    last_shot_time = codec.unpack(frame, game, player_rect, current_time)
+                    schedule_game_timers()
+            else:
+                # One step per frame; none while paused, fewer in slow motion
+                for step in range(game_clock.steps()):
+                    run_game_step(keys, codec)
         
         # Draw game
+        profiler.mark("draw")
         draw_game()
+        latency.presented()
+        if capture is not None:
+            profiler.mark("capture")
+            capture.grab(renderer.canvas)
+        profiler.end_frame()
         
-        # Cap the frame rate
-        clock.tick(60)
+        # Cap the frame rate, then adapt quality to how long the frame took
+        pacer.end_frame()
+        latency.frame_finished(pacer.frame_end)
+        governor.update(pacer.work_ms)
+
+def close_capture():
+    # Finish encoding the frames already captured
+    capture.close()
+    print(capture.report())
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Space Shooter")
+    parser.add_argument("--profile-alloc", action="store_true",
+                        help="report allocations and gc collections per frame and phase on exit")
+    parser.add_argument("--latency", action="store_true",
+                        help="report input-to-present latency histograms on exit")
+    parser.add_argument("--low-latency", action="store_true",
+                        help="sleep before reading input rather than after drawing")
+    parser.add_argument("--capture", metavar="DIR",
+                        help="record every frame as numbered PNG files in DIR")
+    parser.add_argument("--capture-video", metavar="FILE",
+                        help="record gameplay to a video file through ffmpeg")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    main()
+    options = parse_args()
+    if options.profile_alloc:
+        profiler.enabled = True
+        profiler.start()
+        atexit.register(lambda: print(profiler.report()))
+    if options.latency:
+        latency.enabled = True
+        atexit.register(lambda: print(latency.report()))
+    LOW_LATENCY = options.low_latency
+    if options.capture or options.capture_video:
+        # Created before the game starts any threads; PNG encoding forks workers
+        try:
+            if options.capture_video:
+                capture = FrameCapture(renderer.canvas, options.capture_video, CAPTURE_SLOTS,
+                                       encoder=CAPTURE_ENCODER)
+            else:
+                capture = FrameCapture(renderer.canvas, options.capture, CAPTURE_SLOTS, CAPTURE_WORKERS)
+        except (ValueError, RuntimeError) as error:
+            sys.exit(f"Can't capture: {error}")
+        atexit.register(close_capture)
+    try:
+        main()
+    except Exception:
+        # Save the last few seconds of play for debugging
+        if rewind_buffer is not None:
+            rewind_buffer.dump(CRASH_DUMP_FILE)
+        raise
@@ -0,0 +1,325 @@
+"""
+Binary game-state snapshots and a fixed-memory rewind buffer.
+
+A snapshot is the whole Game (plus the player rect and shot cooldown that
+still live outside it) packed with precompiled structs. The rewind buffer
+stores each frame as a compressed XOR delta against the previous frame, so
+any frame can be walked back to from the newest one.
+"""
+
+import struct
+import zlib
+from array import array
+
+import pygame
+
+# Fixed lookup tables so strings pack as single bytes
+GAME_STATES = ("welcome", "playing", "game_over")
+POWER_UP_TYPES = ('health', 'shield', 'rapid_fire', 'double_damage', 'speed_boost')
+
+HEADER = struct.Struct(
+    "<B"      # game_state
+    "iiiii"   # score, wave_number, level, player_health, player_shield
+    "f"       # player_speed
+    "q"       # last_spawn_time
+    "iiii"    # enemies_killed_in_wave, enemies_per_wave, kills_in_combo, combo_multiplier
+    "q"       # combo_timer
+    "?q?q?q"  # rapid_fire, double_damage, speed_boost and their end times
+    "i"       # high_score
+    "hhhh"    # player_rect
+    "q"       # last_shot_time
+    "q"       # time the snapshot was taken
+    "HHHHH"   # lasers, enemy_lasers, enemies, power_ups, explosions
+)
+LASER = struct.Struct("<hhhhBBBhh")
+ENEMY = struct.Struct("<hhhhhfqi?")
+POWER_UP = struct.Struct("<hhhhBiq")
+EXPLOSION = struct.Struct("<hhhhh")
+
+
+class SnapshotCodec:
+    """Packs a Game into bytes and restores it in place."""
+
+    def __init__(self, laser_cls, enemy_cls, power_up_cls, explosion_cls):
+        self.laser_cls = laser_cls
+        self.enemy_cls = enemy_cls
+        self.power_up_cls = power_up_cls
+        self.explosion_cls = explosion_cls
+        self._scratch = bytearray(4096)
+
+    def pack(self, game, player_rect, last_shot_time, now):
+        size = (HEADER.size
+                + LASER.size * (len(game.lasers) + len(game.enemy_lasers))
+                + ENEMY.size * len(game.enemies)
+                + POWER_UP.size * len(game.power_ups)
+                + EXPLOSION.size * len(game.explosions))
+        if size > len(self._scratch):
+            self._scratch = bytearray(size * 2)
+        buf = self._scratch
+
+        HEADER.pack_into(
+            buf, 0,
+            GAME_STATES.index(game.game_state),
+            game.score, game.wave_number, game.level,
+            game.player_health, game.player_shield,
+            game.player_speed,
+            game.last_spawn_time,
+            game.enemies_killed_in_wave, game.enemies_per_wave,
+            game.kills_in_combo, game.combo_multiplier,
+            game.combo_timer,
+            game.rapid_fire, game.rapid_fire_end,
+            game.double_damage, game.double_damage_end,
+            game.speed_boost, game.speed_boost_end,
+            game.high_score,
+            player_rect.x, player_rect.y, player_rect.width, player_rect.height,
+            last_shot_time,
+            now,
+            len(game.lasers), len(game.enemy_lasers), len(game.enemies),
+            len(game.power_ups), len(game.explosions),
+        )
+        offset = HEADER.size
+
+        for lasers in (game.lasers, game.enemy_lasers):
+            for laser in lasers:
+                r = laser.rect
+                LASER.pack_into(buf, offset, r.x, r.y, r.width, r.height,
+                                *laser.color, laser.speed, laser.damage)
+                offset += LASER.size
+
+        for enemy in game.enemies:
+            r = enemy.rect
+            ENEMY.pack_into(buf, offset, r.x, r.y, r.width, r.height,
+                            enemy.health, enemy.speed, enemy.shoot_timer,
+                            enemy.shoot_delay, enemy.can_shoot)
+            offset += ENEMY.size
+
+        for power_up in game.power_ups:
+            r = power_up.rect
+            POWER_UP.pack_into(buf, offset, r.x, r.y, r.width, r.height,
+                               POWER_UP_TYPES.index(power_up.type),
+                               power_up.duration, power_up.start_time)
+            offset += POWER_UP.size
+
+        for explosion in game.explosions:
+            EXPLOSION.pack_into(buf, offset, int(explosion.pos[0]), int(explosion.pos[1]),
+                                explosion.frame, explosion.animation_speed, explosion.counter)
+            offset += EXPLOSION.size
+
+        return bytes(memoryview(buf)[:size])
+
+    def unpack(self, data, game, player_rect, now):
+        """Restore game and player_rect from data and return last_shot_time.
+
+        Timer fields are shifted by the time elapsed since the snapshot was
+        taken, so power-ups and cooldowns resume where they left off.
+        """
+        (state, game.score, game.wave_number, game.level,
+         game.player_health, game.player_shield,
+         game.player_speed,
+         last_spawn_time,
+         game.enemies_killed_in_wave, game.enemies_per_wave,
+         game.kills_in_combo, game.combo_multiplier,
+         combo_timer,
+         game.rapid_fire, rapid_fire_end,
+         game.double_damage, double_damage_end,
+         game.speed_boost, speed_boost_end,
+         game.high_score,
+         player_rect.x, player_rect.y, player_rect.width, player_rect.height,
+         last_shot_time,
+         taken_at,
+         n_lasers, n_enemy_lasers, n_enemies, n_power_ups, n_explosions,
+         ) = HEADER.unpack_from(data, 0)
+
+        shift = now - taken_at
+        game.game_state = GAME_STATES[state]
+        game.last_spawn_time = last_spawn_time + shift
+        game.combo_timer = combo_timer + shift
+        game.rapid_fire_end = rapid_fire_end + shift
+        game.double_damage_end = double_damage_end + shift
+        game.speed_boost_end = speed_boost_end + shift
+        offset = HEADER.size
+
+        view = memoryview(data)
+        game.lasers, offset = self._unpack_lasers(view, offset, n_lasers)
+        game.enemy_lasers, offset = self._unpack_lasers(view, offset, n_enemy_lasers)
+
+        end = offset + ENEMY.size * n_enemies
+        game.enemies = []
+        for x, y, w, h, health, speed, shoot_timer, shoot_delay, can_shoot in \
+                ENEMY.iter_unpack(view[offset:end]):
+            enemy = self.enemy_cls.__new__(self.enemy_cls)
+            enemy.rect = pygame.Rect(x, y, w, h)
+            enemy.health = health
+            enemy.speed = speed
+            enemy.shoot_timer = shoot_timer
+            enemy.shoot_delay = shoot_delay
+            enemy.can_shoot = can_shoot
+            game.enemies.append(enemy)
+        offset = end
+
+        end = offset + POWER_UP.size * n_power_ups
+        game.power_ups = []
+        for x, y, w, h, kind, duration, start_time in POWER_UP.iter_unpack(view[offset:end]):
+            power_up = self.power_up_cls.__new__(self.power_up_cls)
+            power_up.rect = pygame.Rect(x, y, w, h)
+            power_up.type = POWER_UP_TYPES[kind]
+            power_up.duration = duration
+            power_up.start_time = start_time
+            game.power_ups.append(power_up)
+        offset = end
+
+        end = offset + EXPLOSION.size * n_explosions
+        game.explosions = []
+        for x, y, frame, animation_speed, counter in EXPLOSION.iter_unpack(view[offset:end]):
+            explosion = self.explosion_cls.__new__(self.explosion_cls)
+            explosion.pos = (x, y)
+            explosion.frame = frame
+            explosion.animation_speed = animation_speed
+            explosion.counter = counter
+            game.explosions.append(explosion)
+
+        return last_shot_time + shift
+
+    def _unpack_lasers(self, view, offset, count):
+        end = offset + LASER.size * count
+        lasers = []
+        for x, y, w, h, r, g, b, speed, damage in LASER.iter_unpack(view[offset:end]):
+            laser = self.laser_cls.__new__(self.laser_cls)
+            laser.rect = pygame.Rect(x, y, w, h)
+            laser.color = (r, g, b)
+            laser.speed = speed
+            laser.damage = damage
+            lasers.append(laser)
+        return lasers, end
+
+
+def xor_delta(a, b):
+    # Zero-padded XOR, so the same delta leads from a to b and from b to a
+    size = max(len(a), len(b))
+    x = int.from_bytes(a, "little") ^ int.from_bytes(b, "little")
+    return x.to_bytes(size, "little")
+
+
+class RewindBuffer:
+    """Ring buffer holding the last few seconds of snapshots in fixed memory.
+
+    Every record is a compressed XOR delta between a frame and the one before
+    it, so stepping back from the newest frame costs one delta per step and
+    evicting the oldest frame never breaks the chain.
+    """
+
+    def __init__(self, max_frames, memory_budget):
+        self.max_frames = max_frames
+        self.memory_budget = memory_budget
+        self._data = bytearray(memory_budget)
+        self._offsets = array('I', bytes(4 * max_frames))
+        self._lengths = array('I', bytes(4 * max_frames))
+        self._prev_lens = array('I', bytes(4 * max_frames))
+        self._times = array('q', bytes(8 * max_frames))
+        self.dropped = 0
+        # One raw deflate stream for every record: a full flush ends each
+        # record on a byte boundary with no back-references into earlier
+        # ones, so records decompress independently, and the compressor's
+        # working memory isn't allocated again for every frame
+        self._compressor = zlib.compressobj(1, zlib.DEFLATED, -15)
+        self.clear()
+
+    def clear(self):
+        self._first = 0  # slot of the oldest frame
+        self._count = 0
+        self._write = 0  # byte offset for the next record
+        self._head = b""  # newest frame, uncompressed
+
+    def __len__(self):
+        return self._count
+
+    def push(self, frame, timestamp):
+        compressor = self._compressor
+        record = compressor.compress(xor_delta(self._head, frame)) + compressor.flush(zlib.Z_FULL_FLUSH)
+        size = len(record)
+        if size > self.memory_budget:
+            # A single frame bigger than the whole budget can't be kept;
+            # restart the chain from this frame instead
+            self.dropped += 1
+            self.clear()
+            return
+
+        if self._count == self.max_frames:
+            self._evict_oldest()
+
+        if self._write + size > self.memory_budget:
+            # Wrap around, dropping everything left in the tail first
+            tail_start = self._write
+            while self._count and self._offsets[self._first] >= tail_start:
+                self._evict_oldest()
+            self._write = 0
+
+        end = self._write + size
+        while self._count:
+            start = self._offsets[self._first]
+            if start >= end or start + self._lengths[self._first] <= self._write:
+                break
+            self._evict_oldest()
+
+        slot = (self._first + self._count) % self.max_frames
+        self._data[self._write:end] = record
+        self._offsets[slot] = self._write
+        self._lengths[slot] = size
+        self._prev_lens[slot] = len(self._head) if self._count else 0
+        self._times[slot] = timestamp
+        self._count += 1
+        self._write = end
+        self._head = frame
+
+    def _evict_oldest(self):
+        self._first = (self._first + 1) % self.max_frames
+        self._count -= 1
+
+    def peek(self):
+        return self._head or None
+
+    def step_back(self):
+        """Drop the newest frame and return the one before it, or None."""
+        if self._count < 2:
+            return None
+        slot = (self._first + self._count - 1) % self.max_frames
+        prev = self._undo(slot, self._head)
+        self._write = self._offsets[slot]
+        self._count -= 1
+        self._head = prev
+        return prev
+
+    def _undo(self, slot, frame):
+        start = self._offsets[slot]
+        delta = zlib.decompressobj(-15).decompress(self._data[start:start + self._lengths[slot]])
+        return xor_delta(delta, frame)[:self._prev_lens[slot]]
+
+    def frames(self):
+        """Yield (timestamp, frame) from newest to oldest."""
+        frame = self._head
+        for i in range(self._count - 1, -1, -1):
+            slot = (self._first + i) % self.max_frames
+            yield self._times[slot], frame
+            if i:
+                frame = self._undo(slot, frame)
+
+    def dump(self, path):
+        with open(path, "wb") as f:
+            for timestamp, frame in self.frames():
+                f.write(struct.pack("<qI", timestamp, len(frame)))
+                f.write(frame)
+
+
+def load_dump(path):
+    """Read a crash dump back as a list of (timestamp, frame), newest first."""
+    frames = []
+    entry = struct.Struct("<qI")
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset < len(data):
+        timestamp, size = entry.unpack_from(data, offset)
+        offset += entry.size
+        frames.append((timestamp, data[offset:offset + size]))
+        offset += size
+    return frames
@@ -0,0 +1,115 @@
+"""
+Procedural parallax starfield.
+
+The sky is a fixed gradient with several star layers on top, each
+scrolling at its own speed. A layer is an endless vertical strip cut into
+short tiles. Every tile's stars come from a random generator seeded by
+the starfield seed, the layer and the tile index, so a tile can be thrown
+away and rebuilt identically later. Tiles are generated only as they
+scroll into view and kept in a small LRU cache, so scrolling never
+regenerates the screen and memory stays bounded however long it runs.
+An unscrolled starfield is composed once and then drawn in a single blit.
+"""
+
+from collections import OrderedDict
+import random
+
+import pygame
+
+
+class StarLayer:
+    def __init__(self, speed, density, max_size, min_brightness, max_brightness):
+        self.speed = speed  # pixels per millisecond of game time
+        self.density = density  # stars per 100x100 pixels
+        self.max_size = max_size
+        self.min_brightness = min_brightness
+        self.max_brightness = max_brightness
+
+
+# Far to near: the far layer is dense, small and dim, the near one sparse
+# and bright, roughly matching the density of the old static background
+STAR_LAYERS = [
+    StarLayer(0.025, 1.2, 1, 60, 140),
+    StarLayer(0.05, 0.6, 2, 110, 200),
+    StarLayer(0.1, 0.3, 3, 170, 255),
+]
+
+
+class Starfield:
+    def __init__(self, size, seed=None, layers=STAR_LAYERS, tile_height=40, top=(0, 0, 40),
+                 bottom=(0, 0, 20)):
+        self.size = size
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.layers = layers
+        self.tile_height = tile_height
+        self.generated = 0  # tiles built so far, including rebuilt ones
+        # Enough tiles for every layer to cover the screen, with a couple to spare
+        self.max_tiles = len(layers) * (size[1] // tile_height + 3)
+        self._tiles = OrderedDict()
+        self._sky = self._make_sky(top, bottom)
+        self._static = None  # sky and layers composed at time 0
+
+    def _make_sky(self, top, bottom):
+        width, height = self.size
+        sky = pygame.Surface(self.size)
+        for y in range(height):
+            ratio = y / height
+            color = [start + (end - start) * ratio for start, end in zip(top, bottom)]
+            pygame.draw.line(sky, color, (0, y), (width, y))
+        return sky
+
+    def _tile(self, layer_index, index):
+        key = (layer_index, index)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+
+        layer = self.layers[layer_index]
+        rng = random.Random(self.seed * 1000003 + layer_index * 7919 + index)
+        width, height = self.size[0], self.tile_height
+        tile = pygame.Surface((width, height))
+        tile.set_colorkey((0, 0, 0))
+        count = int(layer.density * width * height / 10000 + rng.random())
+        for _ in range(count):
+            size = rng.randint(1, layer.max_size)
+            # Keep each star inside its tile so tiles join without seams
+            margin = size + 1
+            x = rng.randint(margin, width - 1 - margin)
+            y = rng.randint(margin, height - 1 - margin)
+            brightness = rng.randint(layer.min_brightness, layer.max_brightness)
+            if size > 1:
+                pygame.draw.circle(tile, (brightness // 2,) * 3, (x, y), size + 1)
+            pygame.draw.circle(tile, (brightness,) * 3, (x, y), size)
+        if pygame.display.get_surface():
+            tile = tile.convert()
+
+        self._tiles[key] = tile
+        self.generated += 1
+        if len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def draw(self, surface, time_ms):
+        """Draw the sky and every layer scrolled to time_ms."""
+        if time_ms == 0:
+            if self._static is None:
+                self._static = self._sky.copy()
+                self._draw_layers(self._static, 0)
+                if pygame.display.get_surface():
+                    self._static = self._static.convert()
+            surface.blit(self._static, (0, 0))
+            return
+        surface.blit(self._sky, (0, 0))
+        self._draw_layers(surface, time_ms)
+
+    def _draw_layers(self, surface, time_ms):
+        height = self.size[1]
+        tile_height = self.tile_height
+        for layer_index, layer in enumerate(self.layers):
+            offset = int(time_ms * layer.speed)
+            # Stars move down the screen: screen row y shows strip row y - offset
+            first = (-offset) // tile_height
+            last = (height - 1 - offset) // tile_height
+            for index in range(first, last + 1):
+                surface.blit(self._tile(layer_index, index), (0, index * tile_height + offset))
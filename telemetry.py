@@ -0,0 +1,184 @@
+"""
+Gameplay telemetry.
+
+Events are typed records of up to three integers, written into one of two
+preallocated buffers on the game thread. A background thread swaps the
+buffers, turns the full one into gzip-compressed JSON lines and rotates
+the output files. If the writer falls behind (a slow disk, say) events are
+dropped and counted; recording never waits for it.
+"""
+
+import glob
+import gzip
+import os
+import random
+import threading
+import time
+from array import array
+
+# Event types and the names of their fields
+KILL = 0
+COMBO = 1
+POWER_UP = 2
+DAMAGE = 3
+WAVE = 4
+DEATH = 5
+
+EVENT_TYPES = {
+    KILL: ("kill", ("points", "combo_multiplier", "level")),
+    COMBO: ("combo", ("combo_multiplier", "kills_in_combo", "score")),
+    POWER_UP: ("power_up", ("kind", "player_health", "player_shield")),
+    DAMAGE: ("damage", ("source", "health_lost", "shield_lost")),
+    WAVE: ("wave", ("wave_number", "level", "score")),
+    DEATH: ("death", ("score", "wave_number", "level")),
+}
+
+# Values for the DAMAGE source field
+DAMAGE_LASER = 0
+DAMAGE_COLLISION = 1
+DAMAGE_MISSED_ENEMY = 2
+
+# One format string per event type, so writing needs no json encoding
+LINE_FORMATS = {
+    event_type: '{"t":%d,"event":"' + name + '"' +
+                "".join(',"%s":%%d' % field for field in fields) + "}\n"
+    for event_type, (name, fields) in EVENT_TYPES.items()
+}
+
+
+class EventBuffer:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.count = 0
+        self.times = array('q', bytes(8 * capacity))
+        self.types = array('B', bytes(capacity))
+        self.values = array('i', bytes(12 * capacity))
+
+
+class Telemetry:
+    def __init__(self, directory, capacity=4096, flush_interval=1.0, max_file_bytes=8 * 1024 * 1024,
+                 max_files=20, sample_rates=None, enabled=True):
+        """
+        sample_rates: event type -> fraction of events to keep (default all)
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.sample_rates = sample_rates or {}
+        self.enabled = enabled
+        self.recorded = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.written = 0
+
+        self._lock = threading.Lock()
+        self._active = EventBuffer(capacity)
+        self._spare = EventBuffer(capacity)
+        self._full = None
+        self._wake = threading.Event()
+        self._stop = False
+        self._file = None
+        self._file_bytes = 0
+        self._file_number = 0
+        self._session = time.strftime("%Y%m%d-%H%M%S")
+        self._thread = None
+        if enabled:
+            os.makedirs(directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+            self._thread.start()
+
+    def record(self, event_type, t, a=0, b=0, c=0):
+        if not self.enabled:
+            return
+        rate = self.sample_rates.get(event_type)
+        if rate is not None and random.random() >= rate:
+            self.sampled_out += 1
+            return
+
+        with self._lock:
+            buf = self._active
+            if buf.count == buf.capacity:
+                if self._spare is None:
+                    # Writer still busy with the other buffer
+                    self.dropped += 1
+                    return
+                self._full = buf
+                self._active = buf = self._spare
+                self._spare = None
+                self._wake.set()
+            i = buf.count
+            buf.times[i] = t
+            buf.types[i] = event_type
+            buf.values[3 * i] = a
+            buf.values[3 * i + 1] = b
+            buf.values[3 * i + 2] = c
+            buf.count = i + 1
+        self.recorded += 1
+
+    def close(self):
+        if self._thread is None:
+            return
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            stopping = self._stop
+
+            while True:
+                with self._lock:
+                    buf = self._full
+                    self._full = None
+                    if buf is None and self._active.count and self._spare is not None:
+                        # Periodic flush of a partly filled buffer
+                        buf = self._active
+                        self._active = self._spare
+                        self._spare = None
+                if buf is None:
+                    break
+                self._write(buf)
+                buf.count = 0
+                with self._lock:
+                    self._spare = buf
+
+            if stopping:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write(self, buf):
+        times = buf.times
+        types = buf.types
+        values = buf.values
+        lines = []
+        for i in range(buf.count):
+            lines.append(LINE_FORMATS[types[i]] %
+                         (times[i], values[3 * i], values[3 * i + 1], values[3 * i + 2]))
+        data = "".join(lines).encode()
+
+        if self._file is None or self._file_bytes >= self.max_file_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._file_bytes += len(data)
+        self.written += buf.count
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        self._file_number += 1
+        path = os.path.join(self.directory,
+                            f"telemetry-{self._session}-{self._file_number:04d}.jsonl.gz")
+        self._file = gzip.open(path, "wb", compresslevel=6)
+        self._file_bytes = 0
+
+        # Keep only the newest max_files files
+        files = sorted(glob.glob(os.path.join(self.directory, "telemetry-*.jsonl.gz")))
+        for old in files[:-self.max_files]:
+            os.remove(old)
@@ -0,0 +1,154 @@
+"""
+Glyph-atlas text rendering.
+
+Each font/color/effect combination is rasterized once into an atlas
+surface; strings are then composed from glyph blits, so font.render never
+runs per frame. Effects such as glow or drop shadows are baked into the
+glyph cells, which turns a multi-pass glow into one blit per glyph.
+"""
+
+import string
+from collections import OrderedDict
+
+import pygame
+
+DEFAULT_CHARSET = string.digits + string.ascii_letters + string.punctuation + " "
+
+def render_glyph(font, char, color):
+    surf = font.render(char, True, color[:3])
+    if len(color) == 4 and color[3] < 255:
+        surf = surf.convert_alpha() if pygame.display.get_surface() else surf
+        surf.fill((255, 255, 255, color[3]), special_flags=pygame.BLEND_RGBA_MULT)
+    return surf
+
+
+class GlyphAtlas:
+    def __init__(self, font, color, effect=None, effect_color=None, charset=DEFAULT_CHARSET):
+        self.font = font
+        self.color = color
+        self.effect = effect or ()  # offsets at which effect_color is drawn under each glyph
+        self.effect_color = effect_color or color
+        # Padding needed around each glyph so the effect isn't clipped
+        self.pad_left = max([0] + [-dx for dx, dy in self.effect])
+        self.pad_top = max([0] + [-dy for dx, dy in self.effect])
+        self.pad_right = max([0] + [dx for dx, dy in self.effect])
+        self.pad_bottom = max([0] + [dy for dx, dy in self.effect])
+        self.height = font.get_height()
+        self.glyphs = {}  # char -> (area rect, advance)
+        self.surface = None
+        self._build(charset)
+
+    def _build(self, charset):
+        cells = []
+        for char in charset:
+            glyph = render_glyph(self.font, char, self.color)
+            w, h = glyph.get_size()
+            cell = pygame.Surface((w + self.pad_left + self.pad_right,
+                                   h + self.pad_top + self.pad_bottom), pygame.SRCALPHA)
+            if self.effect:
+                effect_glyph = render_glyph(self.font, char, self.effect_color)
+                for dx, dy in self.effect:
+                    cell.blit(effect_glyph, (self.pad_left + dx, self.pad_top + dy))
+            cell.blit(glyph, (self.pad_left, self.pad_top))
+            cells.append((char, cell, w))
+
+        width = sum(cell.get_width() for char, cell, w in cells)
+        height = max(cell.get_height() for char, cell, w in cells)
+        self.surface = pygame.Surface((max(width, 1), height), pygame.SRCALPHA)
+        self.glyphs = {}
+        x = 0
+        for char, cell, advance in cells:
+            self.surface.blit(cell, (x, 0))
+            self.glyphs[char] = (pygame.Rect(x, 0, cell.get_width(), cell.get_height()), advance)
+            x += cell.get_width()
+        if pygame.display.get_surface():
+            self.surface = self.surface.convert_alpha()
+
+    def ensure(self, text):
+        missing = [c for c in text if c not in self.glyphs]
+        if missing:
+            self._build("".join(self.glyphs) + "".join(dict.fromkeys(missing)))
+
+    def width(self, text):
+        self.ensure(text)
+        glyphs = self.glyphs
+        return sum(glyphs[c][1] for c in text)
+
+    def draw(self, surface, text, x, y):
+        self.ensure(text)
+        atlas = self.surface
+        glyphs = self.glyphs
+        x -= self.pad_left
+        y -= self.pad_top
+        for c in text:
+            area, advance = glyphs[c]
+            surface.blit(atlas, (x, y), area)
+            x += advance
+        return x + self.pad_left
+
+
+class TextRenderer:
+    def __init__(self, line_cache_size=256):
+        self.atlases = {}
+        self.line_cache_size = line_cache_size
+        self._lines = OrderedDict()
+
+    def atlas(self, font, color, effect=None, effect_color=None):
+        key = (font, color, effect, effect_color)
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            atlas = GlyphAtlas(font, color, effect, effect_color)
+            self.atlases[key] = atlas
+        return atlas
+
+    def size(self, text, font, color=(255, 255, 255), effect=None, effect_color=None):
+        return self.atlas(font, color, effect, effect_color).width(text), font.get_height()
+
+    def draw(self, surface, text, pos, font, color, effect=None, effect_color=None,
+             center=False, cache=False):
+        """Draw text at pos (top-left, or its center with center=True).
+
+        cache=True keeps the composed line as one surface, which suits
+        labels that never change; leave it off for text that does.
+        Returns the rect the text covers, not counting effects.
+        """
+        atlas = self.atlas(font, color, effect, effect_color)
+        x, y = pos
+        width = atlas.width(text)
+        if center:
+            x -= width // 2
+            y -= atlas.height // 2
+        if cache:
+            line = self._line(atlas, text)
+            surface.blit(line, (x - atlas.pad_left, y - atlas.pad_top))
+        else:
+            atlas.draw(surface, text, x, y)
+        return pygame.Rect(x, y, width, atlas.height)
+
+    def draw_counter(self, surface, label, value, pos, font, color, effect=None, effect_color=None):
+        """Draw a fixed label followed by a changing number, e.g. "SCORE: 120".
+
+        Returns the rect the text covers, not counting effects.
+        """
+        atlas = self.atlas(font, color, effect, effect_color)
+        x, y = pos
+        line = self._line(atlas, label)
+        surface.blit(line, (x - atlas.pad_left, y - atlas.pad_top))
+        end = atlas.draw(surface, str(value), x + atlas.width(label), y)
+        return pygame.Rect(x, y, end - x, atlas.height)
+
+    def _line(self, atlas, text):
+        key = (id(atlas), text)
+        line = self._lines.get(key)
+        if line is not None:
+            self._lines.move_to_end(key)
+            return line
+        width = atlas.width(text) + atlas.pad_left + atlas.pad_right
+        line = pygame.Surface((max(width, 1), atlas.surface.get_height()), pygame.SRCALPHA)
+        atlas.draw(line, text, atlas.pad_left, atlas.pad_top)
+        if pygame.display.get_surface():
+            line = line.convert_alpha()
+        self._lines[key] = line
+        if len(self._lines) > self.line_cache_size:
+            self._lines.popitem(last=False)
+        return line